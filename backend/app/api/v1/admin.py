@@ -103,7 +103,8 @@ async def download_report_pdf(
     Admin endpoint: Download PDF directly (fallback if presigned URL fails)
     """
     from fastapi.responses import StreamingResponse
-    import io
+    from starlette.background import BackgroundTask
+    import tempfile
     from urllib.parse import quote
     
     report = db.query(Report).filter(Report.id == report_id).first()
@@ -119,28 +120,35 @@ async def download_report_pdf(
     try:
         from app.services.s3_storage import S3Storage
         s3_storage = S3Storage()
-        pdf_content = s3_storage.download_pdf(report.s3_key)
-        
-        # Validate PDF content (check for PDF magic bytes)
-        if not pdf_content.startswith(b'%PDF'):
-            logger.error(f"Downloaded content from S3 is not a valid PDF (s3_key: {report.s3_key})")
-            raise HTTPException(status_code=500, detail="Downloaded file is not a valid PDF")
-        
-        # Create a BytesIO stream for the response
-        pdf_stream = io.BytesIO(pdf_content)
-        
-        # Properly encode filename for Content-Disposition header
-        encoded_filename = quote(report.filename, safe='')
-        
-        return StreamingResponse(
-            io.BytesIO(pdf_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="{report.filename}"; filename*=UTF-8\'\'{encoded_filename}',
-                "Content-Length": str(len(pdf_content)),
-                "Content-Type": "application/pdf"
-            }
-        )
+        # Spool to disk past 8 MB so large PDFs are never held whole in memory
+        pdf_stream = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        try:
+            content_length = s3_storage.stream_pdf(report.s3_key, pdf_stream)
+            pdf_stream.seek(0)
+            
+            # Validate PDF content (check for PDF magic bytes)
+            if not pdf_stream.read(4).startswith(b'%PDF'):
+                logger.error(f"Downloaded content from S3 is not a valid PDF (s3_key: {report.s3_key})")
+                raise HTTPException(status_code=500, detail="Downloaded file is not a valid PDF")
+            pdf_stream.seek(0)
+            
+            # Properly encode filename for Content-Disposition header
+            encoded_filename = quote(report.filename, safe='')
+            
+            return StreamingResponse(
+                iter(lambda: pdf_stream.read(64 * 1024), b''),
+                media_type="application/pdf",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{report.filename}"; filename*=UTF-8\'\'{encoded_filename}',
+                    "Content-Length": str(content_length),
+                    "Content-Type": "application/pdf"
+                },
+                background=BackgroundTask(pdf_stream.close)
+            )
+        except Exception:
+            # The response's background task only closes the spool once it has been sent
+            pdf_stream.close()
+            raise
     except HTTPException:
         raise
     except Exception as e:
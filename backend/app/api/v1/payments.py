@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from pydantic import BaseModel
+import json
 import logging
 from datetime import datetime
 
@@ -196,14 +197,15 @@ async def stripe_webhook(
     
     payload = await request.body()
     
+    if not StripeService.verify_webhook(payload, stripe_signature):
+        logger.error("Webhook signature verification failed")
+        raise HTTPException(status_code=400, detail="Invalid signature")
+    
     try:
-        event = StripeService.construct_webhook_event(payload, stripe_signature)
+        event = json.loads(payload)
     except ValueError as e:
         logger.error(f"Invalid webhook payload: {str(e)}")
         raise HTTPException(status_code=400, detail="Invalid payload")
-    except Exception as e:
-        logger.error(f"Webhook signature verification failed: {str(e)}")
-        raise HTTPException(status_code=400, detail="Invalid signature")
     
     # Handle the event
     event_type = event["type"]
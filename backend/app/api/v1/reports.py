@@ -18,9 +18,10 @@ from app.services.ai_analyzer import (
     normalize_scoring_output,
     write_run_exports,
 )
+from app.services.arkat_validator import log_arkat_violations
 from app.services.analysis_cache import get_cached_analysis, upsert_analysis_cache
 from app.services.validert_files import get_scoring_model_info, get_prompt_context_sha
-from app.auth import get_current_user
+from app.auth import get_current_user, verify_lambda_callback
 from app.config import settings
 
 # Import S3 storage if enabled
@@ -604,6 +605,135 @@ async def list_reports(
     
     return result
 
+def _apply_analysis_update(db: Session, report_id: int, analysis_data: dict) -> None:
+    """
+    Store one Lambda analysis result on its report and commit
+
+    Args:
+        db: Database session (rolled back by the caller on failure)
+        report_id: Report to update
+        analysis_data: Callback payload as posted by the Lambda
+    """
+    report = db.query(Report).filter(Report.id == report_id).first()
+    
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    # Update scores (prefer explicit, fallback to v1.4 score_total)
+    ai_analysis_payload = analysis_data.get("ai_analysis", {}) or {}
+    detected_points_payload = analysis_data.get("detected_points")
+    scoring_result_payload = analysis_data.get("scoring_result")
+    document_hash = None
+    if isinstance(detected_points_payload, dict):
+        document_hash = detected_points_payload.get("document", {}).get("document_hash")
+    if isinstance(ai_analysis_payload, dict):
+        ai_analysis_payload = normalize_scoring_output(ai_analysis_payload)
+        log_arkat_violations(ai_analysis_payload)
+        if not isinstance(scoring_result_payload, dict):
+            scoring_result_payload = {}
+        scoring_result_payload["analysis_output"] = ai_analysis_payload
+        scoring_result_payload["feedback_v11"] = build_feedback_v11(
+            ai_analysis_payload,
+            detected_points_payload or {},
+            report_id=str(report_id),
+            document_hash=document_hash,
+        )
+    score_total = ai_analysis_payload.get("score_total")
+    report.overall_score = analysis_data.get("overall_score", score_total or 0.0)
+    report.quality_score = analysis_data.get("quality_score", 0.0)
+    report.completeness_score = analysis_data.get("completeness_score", 0.0)
+    report.compliance_score = analysis_data.get("compliance_score", 0.0)
+    report.ai_analysis = ai_analysis_payload
+    if detected_points_payload is not None:
+        report.detected_points = detected_points_payload
+    if scoring_result_payload is not None:
+        report.scoring_result = scoring_result_payload
+    report.status = "completed"
+
+    if not document_hash and report.extracted_text:
+        document_hash = hashlib.sha256(report.extracted_text.encode("utf-8")).hexdigest()
+    if document_hash:
+        report.document_hash = document_hash
+        scoring_model_info = get_scoring_model_info()
+        upsert_analysis_cache(
+            db,
+            document_hash=document_hash,
+            scoring_model_sha=scoring_model_info.get("sha256"),
+            pipeline_git_sha=_get_pipeline_cache_sha(),
+            detected_points=detected_points_payload,
+            scoring_result=scoring_result_payload,
+            ai_analysis=ai_analysis_payload,
+        )
+        write_run_exports(document_hash, ai_analysis_payload, detected_points_payload or {}, scoring_result_payload or {})
+    
+    # Check for automatic refund (96%+ trygghetsscore)
+    user = db.query(User).filter(User.id == report.user_id).first()
+    if user:
+        trygghetsscore = None
+        if isinstance(ai_analysis_payload, dict):
+            score_total = ai_analysis_payload.get("score_total")
+            if isinstance(score_total, (int, float)):
+                trygghetsscore = float(score_total)
+
+        if trygghetsscore is None:
+            trygghetsscore = report.overall_score
+        
+        # Auto-refund if score is 96% or higher
+        if trygghetsscore and trygghetsscore >= 96.0:
+            # Find the usage transaction for this report
+            usage_transaction = db.query(CreditTransaction).filter(
+                CreditTransaction.user_id == user.id,
+                CreditTransaction.report_id == report.id,
+                CreditTransaction.transaction_type == "usage"
+            ).order_by(CreditTransaction.created_at.desc()).first()
+            
+            if usage_transaction:
+                refund_amount = abs(usage_transaction.amount)  # Get positive amount
+                user.credits += refund_amount
+                
+                # Create refund transaction
+                refund_transaction = CreditTransaction(
+                    user_id=user.id,
+                    amount=refund_amount,
+                    transaction_type="auto_refund",
+                    description=f"Automatic refund: {refund_amount} credits for achieving {trygghetsscore:.1f}% trygghetsscore on report: {report.filename}",
+                    report_id=report.id
+                )
+                db.add(refund_transaction)
+                logger.info(f"Auto-refunded {refund_amount} credits to user {user.id} for report {report.id} (score: {trygghetsscore:.1f}%)")
+    
+    # Delete existing components and findings
+    db.query(Component).filter(Component.report_id == report_id).delete()
+    db.query(Finding).filter(Finding.report_id == report_id).delete()
+    
+    # Store components
+    for comp_data in analysis_data.get("components", []):
+        component = Component(
+            report_id=report.id,
+            component_type=comp_data.get("component_type", "Unknown"),
+            name=comp_data.get("name", ""),
+            condition=comp_data.get("condition"),
+            description=comp_data.get("description"),
+            score=comp_data.get("score")
+        )
+        db.add(component)
+    
+    # Store findings
+    for finding_data in analysis_data.get("findings", []):
+        finding = Finding(
+            report_id=report.id,
+            finding_type=finding_data.get("finding_type", "general"),
+            severity=finding_data.get("severity", "info"),
+            title=finding_data.get("title", ""),
+            description=finding_data.get("description", ""),
+            suggestion=finding_data.get("suggestion"),
+            standard_reference=finding_data.get("standard_reference")
+        )
+        db.add(finding)
+    
+    db.commit()
+
+
 @router.post("/{report_id}/update-analysis")
 async def update_report_analysis(
     report_id: int,
@@ -615,123 +745,7 @@ async def update_report_analysis(
     Internal endpoint for Lambda callbacks
     """
     try:
-        report = db.query(Report).filter(Report.id == report_id).first()
-        
-        if not report:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        # Update scores (prefer explicit, fallback to v1.4 score_total)
-        ai_analysis_payload = analysis_data.get("ai_analysis", {}) or {}
-        detected_points_payload = analysis_data.get("detected_points")
-        scoring_result_payload = analysis_data.get("scoring_result")
-        document_hash = None
-        if isinstance(detected_points_payload, dict):
-            document_hash = detected_points_payload.get("document", {}).get("document_hash")
-        if isinstance(ai_analysis_payload, dict):
-            ai_analysis_payload = normalize_scoring_output(ai_analysis_payload)
-            if not isinstance(scoring_result_payload, dict):
-                scoring_result_payload = {}
-            scoring_result_payload["analysis_output"] = ai_analysis_payload
-            scoring_result_payload["feedback_v11"] = build_feedback_v11(
-                ai_analysis_payload,
-                detected_points_payload or {},
-                report_id=str(report_id),
-                document_hash=document_hash,
-            )
-        score_total = ai_analysis_payload.get("score_total")
-        report.overall_score = analysis_data.get("overall_score", score_total or 0.0)
-        report.quality_score = analysis_data.get("quality_score", 0.0)
-        report.completeness_score = analysis_data.get("completeness_score", 0.0)
-        report.compliance_score = analysis_data.get("compliance_score", 0.0)
-        report.ai_analysis = ai_analysis_payload
-        if detected_points_payload is not None:
-            report.detected_points = detected_points_payload
-        if scoring_result_payload is not None:
-            report.scoring_result = scoring_result_payload
-        report.status = "completed"
-
-        if not document_hash and report.extracted_text:
-            document_hash = hashlib.sha256(report.extracted_text.encode("utf-8")).hexdigest()
-        if document_hash:
-            report.document_hash = document_hash
-            scoring_model_info = get_scoring_model_info()
-            upsert_analysis_cache(
-                db,
-                document_hash=document_hash,
-                scoring_model_sha=scoring_model_info.get("sha256"),
-                pipeline_git_sha=_get_pipeline_cache_sha(),
-                detected_points=detected_points_payload,
-                scoring_result=scoring_result_payload,
-                ai_analysis=ai_analysis_payload,
-            )
-            write_run_exports(document_hash, ai_analysis_payload, detected_points_payload or {}, scoring_result_payload or {})
-        
-        # Check for automatic refund (96%+ trygghetsscore)
-        user = db.query(User).filter(User.id == report.user_id).first()
-        if user:
-            trygghetsscore = None
-            if isinstance(ai_analysis_payload, dict):
-                score_total = ai_analysis_payload.get("score_total")
-                if isinstance(score_total, (int, float)):
-                    trygghetsscore = float(score_total)
-
-            if trygghetsscore is None:
-                trygghetsscore = report.overall_score
-            
-            # Auto-refund if score is 96% or higher
-            if trygghetsscore and trygghetsscore >= 96.0:
-                # Find the usage transaction for this report
-                usage_transaction = db.query(CreditTransaction).filter(
-                    CreditTransaction.user_id == user.id,
-                    CreditTransaction.report_id == report.id,
-                    CreditTransaction.transaction_type == "usage"
-                ).order_by(CreditTransaction.created_at.desc()).first()
-                
-                if usage_transaction:
-                    refund_amount = abs(usage_transaction.amount)  # Get positive amount
-                    user.credits += refund_amount
-                    
-                    # Create refund transaction
-                    refund_transaction = CreditTransaction(
-                        user_id=user.id,
-                        amount=refund_amount,
-                        transaction_type="auto_refund",
-                        description=f"Automatic refund: {refund_amount} credits for achieving {trygghetsscore:.1f}% trygghetsscore on report: {report.filename}",
-                        report_id=report.id
-                    )
-                    db.add(refund_transaction)
-                    logger.info(f"Auto-refunded {refund_amount} credits to user {user.id} for report {report.id} (score: {trygghetsscore:.1f}%)")
-        
-        # Delete existing components and findings
-        db.query(Component).filter(Component.report_id == report_id).delete()
-        db.query(Finding).filter(Finding.report_id == report_id).delete()
-        
-        # Store components
-        for comp_data in analysis_data.get("components", []):
-            component = Component(
-                report_id=report.id,
-                component_type=comp_data.get("component_type", "Unknown"),
-                name=comp_data.get("name", ""),
-                condition=comp_data.get("condition"),
-                description=comp_data.get("description"),
-                score=comp_data.get("score")
-            )
-            db.add(component)
-        
-        # Store findings
-        for finding_data in analysis_data.get("findings", []):
-            finding = Finding(
-                report_id=report.id,
-                finding_type=finding_data.get("finding_type", "general"),
-                severity=finding_data.get("severity", "info"),
-                title=finding_data.get("title", ""),
-                description=finding_data.get("description", ""),
-                suggestion=finding_data.get("suggestion"),
-                standard_reference=finding_data.get("standard_reference")
-            )
-            db.add(finding)
-        
-        db.commit()
+        _apply_analysis_update(db, report_id, analysis_data)
         logger.info(f"Successfully updated report {report_id} from Lambda")
         
         return {"status": "success", "report_id": report_id}
@@ -740,3 +754,33 @@ async def update_report_analysis(
         db.rollback()
         logger.error(f"Error updating report {report_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/bulk-update-analysis", dependencies=[Depends(verify_lambda_callback)])
+async def bulk_update_report_analysis(
+    bulk_data: dict,
+    db: Session = Depends(get_db)
+):
+    """
+    Update several reports with analysis results from Lambda in one request
+    Internal endpoint for batched Lambda callbacks (requires the
+    X-Callback-Secret header); each report is committed on its own, so one
+    failure doesn't undo the others. Each result echoes the update's item_id,
+    so callers can match results even when a report appears twice
+    """
+    results = []
+    for update in bulk_data.get("updates", []):
+        report_id = update.get("report_id")
+        item_id = update.get("item_id")
+        try:
+            _apply_analysis_update(db, int(report_id), update.get("analysis") or {})
+            results.append({"item_id": item_id, "report_id": report_id, "status": "success"})
+        except Exception as e:
+            db.rollback()
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Error updating report {report_id}: {detail}")
+            results.append({"item_id": item_id, "report_id": report_id, "status": "error", "detail": detail})
+    
+    failed = sum(1 for result in results if result["status"] != "success")
+    logger.info(f"Bulk analysis update: {len(results) - failed} updated, {failed} failed")
+    return {"status": "success" if failed == 0 else "partial", "results": results}
@@ -1,6 +1,8 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+import hmac
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
@@ -89,6 +91,19 @@ def get_current_user_optional(
     except HTTPException:
         return None
 
+def verify_lambda_callback(
+    x_callback_secret: Optional[str] = Header(None, alias="X-Callback-Secret")
+) -> None:
+    """Verify that an internal callback carries the PDF Lambda's shared secret"""
+    expected = settings.LAMBDA_CALLBACK_SECRET
+    if not expected or not x_callback_secret or not hmac.compare_digest(
+        x_callback_secret.encode("utf-8"), expected.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid callback secret"
+        )
+
 def get_current_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -36,7 +36,9 @@ class Settings(BaseSettings):
     USE_SQS_PROCESSING: bool = False  # Set to True to use SQS + Lambda for async processing
     AWS_REGION: str = "eu-north-1"  # Bedrock region (Stockholm)
     S3_BUCKET_NAME: str = "validert-reports"
+    VALIDERT_ENSURE_BUCKET: bool = True  # Set to False to skip the head/create bucket check when S3Storage is first used
     SQS_QUEUE_URL: str = ""  # SQS queue URL for async PDF processing
+    LAMBDA_CALLBACK_SECRET: str = ""  # Shared secret the PDF Lambda sends as X-Callback-Secret; bulk callbacks are refused while unset
     
     # Stripe Configuration
     STRIPE_SECRET_KEY: str = ""
@@ -1,5 +1,5 @@
 from openai import OpenAI
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import json
 import logging
@@ -9,8 +9,9 @@ import uuid
 from pathlib import Path
 from app.config import settings
 from app.schemas import AnalysisResult, ComponentBase, FindingBase
-from app.services.system_prompt import SYSTEM_PROMPT
-from app.services.validert_files import build_prompt_context, get_prompt_context_sha, get_scoring_model_info, get_scoring_model_text
+from app.services.arkat_validator import log_arkat_violations
+from app.services.system_prompt import get_cached_system_prompt
+from app.services.validert_files import get_detected_points_validator, get_feedback_validator, get_output_validator, get_prompt_context_block, get_prompt_context_sha, get_scoring_model_info, get_scoring_model_text
 
 logger = logging.getLogger(__name__)
 
@@ -194,6 +195,16 @@ def _build_detected_points_payload(
     }
 
 
+def _check_schema(get_validator: Callable[[], Optional[Callable]], payload: Dict[str, object], name: str) -> None:
+    """Validate payload with a compiled schema validator; mismatches are only logged"""
+    try:
+        validator = get_validator()
+        if validator is not None:
+            validator(payload)
+    except Exception as e:
+        logger.warning(f"{name} does not match its schema: {str(e)}")
+
+
 def _is_numeric_point_id(value: str) -> bool:
     if not value:
         return False
@@ -1030,9 +1041,11 @@ class AIAnalyzer:
             if not document_hash:
                 document_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-            prompt_context = build_prompt_context()
+            prompt_context_block = get_prompt_context_block()
+            prompt_context = prompt_context_block["cached_prefix"]
+            system_prompt = get_cached_system_prompt()
 
-            system_tokens = estimate_tokens(SYSTEM_PROMPT)
+            system_tokens = estimate_tokens(system_prompt)
             response_tokens = 8000
             context_tokens = estimate_tokens(context_info)
             prompt_context_tokens = estimate_tokens(prompt_context)
@@ -1065,10 +1078,10 @@ class AIAnalyzer:
                 pdf_metadata=pdf_metadata,
             )
 
-            user_prompt = f"""
+            # Report-specific part of the prompt. The static prompt context is
+            # sent first (as a cacheable prefix) so provider prompt caches hit.
+            report_prompt = f"""
 {context_info}
-
-{prompt_context}
 {truncation_note}
 
 ===== TILSTANDSRAPPORT SOM SKAL ANALYSERES =====
@@ -1091,18 +1104,23 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
                 logger.info("Using AWS Bedrock Claude for analysis")
                 from app.services.bedrock_ai import BedrockAI
                 bedrock = BedrockAI(region=settings.AWS_REGION)
-                analysis_output = bedrock.analyze_report_with_claude(user_prompt=user_prompt)
+                analysis_output = bedrock.analyze_report_with_claude(
+                    user_prompt=report_prompt,
+                    cached_prefix=prompt_context,
+                )
                 model_name = "eu.anthropic.claude-sonnet-4-20250514-v1:0"
             else:
                 logger.info("Using OpenAI GPT-4 for analysis")
                 client = get_openai_client()
                 model = settings.OPENAI_MODEL
+                # OpenAI caches shared prompt prefixes automatically
+                user_prompt = prompt_context + "\n" + report_prompt
 
                 try:
                     request_kwargs = {
                         "model": model,
                         "messages": [
-                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "system", "content": system_prompt},
                             {"role": "user", "content": user_prompt},
                         ],
                         "temperature": 0.0,
@@ -1121,7 +1139,7 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
                         fallback_kwargs = {
                             "model": model,
                             "messages": [
-                                {"role": "system", "content": SYSTEM_PROMPT},
+                                {"role": "system", "content": system_prompt},
                                 {"role": "user", "content": user_prompt},
                             ],
                             "temperature": 0.0,
@@ -1154,12 +1172,15 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
             _ensure_issue_evidence(analysis_output, text)
             _ensure_driver_evidence(analysis_output)
             _normalize_scoring_output(analysis_output)
+            log_arkat_violations(analysis_output)
             meta = analysis_output.get("meta", {})
             if isinstance(meta, dict):
                 meta.setdefault("scoring_model_id", scoring_model_info.get("model_id", ""))
                 meta.setdefault("scoring_model_version", scoring_model_info.get("version", ""))
                 meta.setdefault("scoring_model_updated_at", scoring_model_info.get("updated_at", ""))
                 analysis_output["meta"] = meta
+            _check_schema(get_output_validator, analysis_output, "AI output")
+            _check_schema(get_detected_points_validator, detected_points_payload, "Detected points")
             if settings.USE_AWS_BEDROCK:
                 seed_used = None
             else:
@@ -1175,7 +1196,7 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
                 "seed": seed_used,
                 "text_sha256": document_hash,
                 "scoring_model": scoring_model_info,
-                "pipeline_git_sha": f"{settings.PIPELINE_GIT_SHA}:{get_prompt_context_sha()}" if settings.PIPELINE_GIT_SHA else get_prompt_context_sha(),
+                "pipeline_git_sha": f"{settings.PIPELINE_GIT_SHA}:{prompt_context_block['cache_key']}" if settings.PIPELINE_GIT_SHA else prompt_context_block["cache_key"],
             }
             logger.info("Detected %s points before scoring", len(detected_points))
 
@@ -1184,15 +1205,17 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
                 meta["model_notes"] = "Rapporttekst ble trunkert - full dokumentanalyse ikke mulig"
                 analysis_output["meta"] = meta
 
+            feedback_v11 = _build_feedback_v11(
+                analysis_output,
+                detected_points_payload,
+                report_id=document_id,
+                document_hash=document_hash,
+            )
+            _check_schema(get_feedback_validator, feedback_v11, "Feedback v1.1")
             scoring_result_payload = {
                 "run_meta": run_meta,
                 "analysis_output": analysis_output,
-                "feedback_v11": _build_feedback_v11(
-                    analysis_output,
-                    detected_points_payload,
-                    report_id=document_id,
-                    document_hash=document_hash,
-                ),
+                "feedback_v11": feedback_v11,
             }
 
             result = build_analysis_result_from_output(analysis_output)
@@ -0,0 +1,82 @@
+"""
+ARKAT validator - deterministic TG2/TG3/TGIU checks on analysis findings
+"""
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+ARKAT_FIELDS = ("arsak", "risiko", "konsekvens", "anbefalt_tiltak")
+
+# Mandatory ARKAT fields per TG (rag_validert_rules: TG2 = Årsak + Konsekvens,
+# TG3 = full ARKAT, TGIU = risiko + konsekvens)
+REQUIRED_ARKAT_FIELDS: Dict[str, frozenset] = {
+    "TG2": frozenset(("arsak", "konsekvens")),
+    "TG3": frozenset(ARKAT_FIELDS),
+    "TGIU": frozenset(("risiko", "konsekvens")),
+}
+
+
+def check_arkat_requirements(analysis_output: Dict[str, object]) -> List[Dict[str, str]]:
+    """
+    Check the mandatory ARKAT fields for each finding's TG.
+
+    Read-only: a mandatory field the model left out, or did not mark as
+    present, is reported but the findings are not changed.
+
+    Args:
+        analysis_output: Model output with a 'findings' array
+
+    Returns:
+        One {component_id, tg, field, status} entry per mandatory field that
+        is not present
+    """
+    violations = []
+    findings = analysis_output.get("findings")
+    if not isinstance(findings, list):
+        return violations
+
+    for finding in findings:
+        if not isinstance(finding, dict):
+            continue
+        required_fields = REQUIRED_ARKAT_FIELDS.get(finding.get("tg"))
+        if not required_fields:
+            continue
+        arkat = finding.get("arkat")
+        if not isinstance(arkat, dict):
+            arkat = {}
+
+        for field in ARKAT_FIELDS:
+            if field not in required_fields:
+                continue
+            value = arkat.get(field)
+            status = (value.get("status") if isinstance(value, dict) else None) or "missing"
+            if status != "present":
+                violations.append({
+                    "component_id": str(finding.get("component_id", "")),
+                    "tg": finding.get("tg"),
+                    "field": field,
+                    "status": status,
+                })
+
+    return violations
+
+
+def log_arkat_violations(analysis_output: Dict[str, object]) -> List[Dict[str, str]]:
+    """
+    Run check_arkat_requirements and log a summary of what it found
+
+    Args:
+        analysis_output: Model output with a 'findings' array
+
+    Returns:
+        The violations from check_arkat_requirements
+    """
+    violations = check_arkat_requirements(analysis_output)
+    if violations:
+        logger.info(
+            "ARKAT check: %s mandatory field(s) not present (%s)",
+            len(violations),
+            ", ".join(f"{v['component_id']} {v['tg']} {v['field']}" for v in violations[:10]),
+        )
+    return violations
@@ -9,7 +9,7 @@ import time
 from typing import Dict, List, Optional
 from botocore.config import Config
 from botocore.exceptions import ClientError
-from app.services.system_prompt import SYSTEM_PROMPT
+from app.services.system_prompt import get_system_prompt_block
 
 logger = logging.getLogger(__name__)
 
@@ -119,12 +119,14 @@ class BedrockAI:
         
         raise Exception("Failed to invoke Bedrock model after all retries")
     
-    def analyze_report_with_claude(self, user_prompt: str) -> Dict:
+    def analyze_report_with_claude(self, user_prompt: str, cached_prefix: Optional[str] = None) -> Dict:
         """
         Analyze report using Claude via AWS Bedrock
         
         Args:
-            user_prompt: Fully composed user prompt string
+            user_prompt: Report-specific user prompt string
+            cached_prefix: Optional static prompt context, sent as a separate
+                cache_control block before user_prompt so Bedrock can reuse it
         
         Returns:
             Analysis result as dict
@@ -134,16 +136,28 @@ class BedrockAI:
             # Model ID: anthropic.claude-sonnet-4-20250514-v1:0
 
             def _build_body(prompt: str) -> str:
+                if cached_prefix:
+                    content = [
+                        {
+                            "type": "text",
+                            "text": cached_prefix,
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {"type": "text", "text": prompt}
+                    ]
+                else:
+                    content = prompt
                 return json.dumps({
                     "anthropic_version": "bedrock-2023-05-31",
                     "max_tokens": 8000,  # Increased for larger JSON response with new structure
                     "temperature": 0.0,
                     "top_p": 1.0,
-                    "system": SYSTEM_PROMPT,
+                    # Static, cache_control-marked system block (Bedrock prompt caching)
+                    "system": get_system_prompt_block(),
                     "messages": [
                         {
                             "role": "user",
-                            "content": prompt
+                            "content": content
                         }
                     ]
                 })
@@ -3,6 +3,8 @@ Bedrock RAG Indexer - Index standards using AWS Bedrock embeddings
 """
 import boto3
 import json
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from pinecone import Pinecone, ServerlessSpec
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app.services.pdf_extractor import PDFExtractor
@@ -13,6 +15,12 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Titan embeddings take one inputText per request, so chunks in a batch are
+# embedded concurrently; throttling is handled by botocore's adaptive retries
+EMBED_CONCURRENCY = 8
+# Pinecone accepts up to 100 vectors per upsert
+UPSERT_BATCH_SIZE = 100
+
 class BedrockRAGIndexer:
     """Index standards documents using AWS Bedrock embeddings"""
     
@@ -20,7 +28,11 @@ class BedrockRAGIndexer:
         # Initialize Bedrock
         self.bedrock_runtime = boto3.client(
             service_name='bedrock-runtime',
-            region_name=settings.AWS_REGION
+            region_name=settings.AWS_REGION,
+            config=Config(
+                max_pool_connections=50,
+                retries={'max_attempts': 10, 'mode': 'adaptive'}
+            )
         )
         
         # Initialize Pinecone
@@ -73,6 +85,20 @@ class BedrockRAGIndexer:
             logger.error(f"Bedrock embedding error: {str(e)}")
             raise
     
+    def is_document_indexed(self, source_sha: str) -> bool:
+        """Check whether a source file (by sha256) was completely indexed by a previous run"""
+        # Metadata-only lookup; the query vector just has to be non-zero for cosine
+        probe = [0.0] * 1024
+        probe[0] = 1.0
+        result = self.index.query(
+            vector=probe,
+            top_k=1,
+            filter={'source_sha': {'$eq': source_sha}, 'index_complete': {'$eq': True}},
+            include_values=False,
+            include_metadata=False
+        )
+        return bool(result.matches)
+    
     def index_document(self, file_path: str, metadata: Dict):
         """Index a standards document using Bedrock embeddings"""
         try:
@@ -94,42 +120,42 @@ class BedrockRAGIndexer:
             logger.info(f"Split into {len(chunks)} chunks")
             
             # Process in batches
-            batch_size = 25  # Bedrock has stricter rate limits
+            batch_size = UPSERT_BATCH_SIZE
             total_uploaded = 0
             
-            for i in range(0, len(chunks), batch_size):
-                batch_chunks = chunks[i:i+batch_size]
-                
-                # Generate embeddings using Bedrock
-                vectors = []
-                for j, chunk in enumerate(batch_chunks):
-                    chunk_index = i + j
+            with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+                for i in range(0, len(chunks), batch_size):
+                    batch_chunks = chunks[i:i+batch_size]
                     
-                    # Generate embedding
-                    embedding = self.generate_embedding(chunk)
+                    # Generate embeddings using Bedrock (one request per chunk, in parallel)
+                    embeddings = list(executor.map(self.generate_embedding, batch_chunks))
                     
-                    vector_id = f"{metadata['standard'].replace(' ', '_').replace(':', '_')}-chunk-{chunk_index}"
-                    vectors.append({
-                        'id': vector_id,
-                        'values': embedding,
-                        'metadata': {
-                            'text': chunk,
-                            'standard': metadata['standard'],
-                            'category': metadata.get('category', 'unknown'),
-                            'chunk_index': chunk_index,
-                            'embedding_model': 'bedrock-titan-v2'
-                        }
-                    })
+                    vectors = []
+                    for j, (chunk, embedding) in enumerate(zip(batch_chunks, embeddings)):
+                        chunk_index = i + j
+                        vector_id = f"{metadata['standard'].replace(' ', '_').replace(':', '_')}-chunk-{chunk_index}"
+                        vectors.append({
+                            'id': vector_id,
+                            'values': embedding,
+                            'metadata': {
+                                'text': chunk,
+                                'standard': metadata['standard'],
+                                'category': metadata.get('category', 'unknown'),
+                                'chunk_index': chunk_index,
+                                'embedding_model': 'bedrock-titan-v2',
+                                'source_sha': metadata.get('source_sha', '')
+                            }
+                        })
                     
-                    # Small delay between embeddings
-                    time.sleep(0.1)
-                
-                # Upload batch to Pinecone
-                self.index.upsert(vectors=vectors)
-                total_uploaded += len(vectors)
-                logger.info(f"Uploaded batch {i//batch_size + 1} ({total_uploaded}/{len(chunks)} chunks)")
-                
-                time.sleep(1)  # Delay between batches
+                    # Upload batch to Pinecone
+                    self.index.upsert(vectors=vectors)
+                    total_uploaded += len(vectors)
+                    logger.info(f"Uploaded batch {i//batch_size + 1} ({total_uploaded}/{len(chunks)} chunks)")
+            
+            # Mark the document complete only once every batch is in, so a run that
+            # fails partway is re-indexed next time instead of skipped
+            if total_uploaded:
+                self.index.update(id=vectors[-1]['id'], set_metadata={'index_complete': True})
             
             logger.info(f"✅ Indexed {metadata['standard']} with Bedrock ({total_uploaded} chunks)")
             return total_uploaded
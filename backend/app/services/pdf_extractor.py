@@ -80,10 +80,14 @@ class PDFExtractor:
                     tables = page.extract_tables()
                     table_text = ""
                     if tables:
-                        for table in tables:
-                            for row in table:
-                                if row:
-                                    table_text += " | ".join([str(cell) if cell else "" for cell in row]) + "\n"
+                        rows = [
+                            " | ".join(str(cell) if cell else "" for cell in row)
+                            for table in tables
+                            for row in table
+                            if row
+                        ]
+                        if rows:
+                            table_text = "\n".join(rows) + "\n"
                     
                     # Combine page text and table text
                     combined_text = ""
@@ -2,17 +2,43 @@
 RAG Indexer - Index standards documents into Pinecone vector database
 """
 import os
+import base64
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
 from pinecone import Pinecone, ServerlessSpec
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app.services.pdf_extractor import PDFExtractor
 from app.config import settings
 import logging
-from typing import Dict
+from typing import Dict, List
 import time
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Next to the backend package, not in whatever directory the indexer was started from
+EMBED_CACHE_PATH = Path(__file__).resolve().parents[2] / "embed_cache.db"
+
+# Only throttle when less than this fraction of the rate-limit budget is left
+RATE_LIMIT_HEADROOM = 0.1
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_reset_seconds(value: str) -> float:
+    """Parse an OpenAI reset header such as '1s', '6m0s' or '120ms' into seconds"""
+    return sum(
+        float(amount) * _DURATION_UNITS[unit]
+        for amount, unit in _DURATION_PART_RE.findall(value or "")
+    )
+
 class RAGIndexer:
     """Index standards documents into Pinecone vector database"""
     
@@ -46,6 +72,122 @@ class RAGIndexer:
             length_function=len,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
+        
+        # Local embedding cache so re-indexing only pays for changed chunks
+        # (shared across indexing threads, so access goes through cache_lock)
+        self.cache = sqlite3.connect(EMBED_CACHE_PATH, check_same_thread=False)
+        self.cache_lock = threading.Lock()
+        self.cache.execute("PRAGMA journal_mode=WAL")
+        self.cache.execute("PRAGMA synchronous=NORMAL")
+        self.cache.execute("CREATE TABLE IF NOT EXISTS e(h BLOB PRIMARY KEY, v BLOB)")
+    
+    @staticmethod
+    def _chunk_hash(chunk: str) -> bytes:
+        """Cache key for a chunk: sha256 of chunk text + embedding model"""
+        return hashlib.sha256((chunk + EMBEDDING_MODEL).encode("utf-8")).digest()
+    
+    def _create_embeddings(self, inputs: List[str], max_retries: int = 5):
+        """
+        Call the OpenAI embeddings API, pacing on its rate-limit headers
+        
+        Sleeps only when the remaining request/token budget drops below
+        RATE_LIMIT_HEADROOM, and retries 429s with exponential backoff and jitter.
+        """
+        for attempt in range(max_retries):
+            try:
+                raw_response = self.client.embeddings.with_raw_response.create(
+                    model=EMBEDDING_MODEL,
+                    input=inputs,
+                    encoding_format="base64"
+                )
+            except RateLimitError:
+                if attempt < max_retries - 1:
+                    # Exponential backoff with jitter: ~1s, 2s, 4s, 8s
+                    wait_time = 2 ** attempt + random.uniform(0, 1)
+                    logger.warning(f"OpenAI rate limit (attempt {attempt + 1}/{max_retries}), waiting {wait_time:.1f}s...")
+                    time.sleep(wait_time)
+                    continue
+                logger.error("OpenAI rate limit - max retries reached")
+                raise
+            except Exception as e:
+                logger.error(f"Error generating embeddings: {str(e)}")
+                raise
+            
+            self._respect_rate_limit(raw_response.headers)
+            return raw_response.parse()
+        
+        raise Exception("Failed to generate embeddings after all retries")
+    
+    @staticmethod
+    def _respect_rate_limit(headers) -> None:
+        """Sleep only when the request or token budget is nearly exhausted"""
+        wait_time = 0.0
+        for kind in ("requests", "tokens"):
+            try:
+                limit = int(headers.get(f"x-ratelimit-limit-{kind}", 0))
+                remaining = int(headers.get(f"x-ratelimit-remaining-{kind}", 0))
+            except ValueError:
+                continue
+            if limit <= 0 or remaining >= limit * RATE_LIMIT_HEADROOM:
+                continue
+            reset = _parse_reset_seconds(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            wait_time = max(wait_time, reset / max(remaining, 1))
+        
+        if wait_time > 0:
+            logger.info(f"Approaching OpenAI rate limit, waiting {wait_time:.2f}s")
+            time.sleep(wait_time)
+    
+    def _embed_chunks(self, chunks: List[str]) -> List[array]:
+        """
+        Embed a batch of chunks, only calling OpenAI for cache misses
+        
+        Embeddings are requested base64-encoded and kept as packed float32
+        arrays (the same bytes stored in the local cache) instead of lists
+        of Python floats.
+        """
+        hashes = [self._chunk_hash(chunk) for chunk in chunks]
+        placeholders = ",".join("?" * len(hashes))
+        with self.cache_lock:
+            cached = dict(self.cache.execute(
+                f"SELECT h, v FROM e WHERE h IN ({placeholders})", hashes
+            ))
+        
+        missing = [j for j, h in enumerate(hashes) if h not in cached]
+        if missing:
+            embeddings_response = self._create_embeddings([chunks[j] for j in missing])
+            
+            rows = []
+            for j, item in zip(missing, embeddings_response.data):
+                # base64 payload is little-endian float32, stored as-is
+                blob = base64.b64decode(item.embedding)
+                cached[hashes[j]] = blob
+                rows.append((hashes[j], blob))
+            with self.cache_lock:
+                self.cache.executemany("INSERT OR REPLACE INTO e(h, v) VALUES (?, ?)", rows)
+                self.cache.commit()
+        
+        logger.info(f"Embedding cache: {len(chunks) - len(missing)} hits, {len(missing)} misses")
+        
+        embeddings = []
+        for h in hashes:
+            values = array("f")
+            values.frombytes(cached[h])
+            embeddings.append(values)
+        return embeddings
+    
+    def is_document_indexed(self, source_sha: str) -> bool:
+        """Check whether a source file (by sha256) was completely indexed by a previous run"""
+        # Metadata-only lookup; the query vector just has to be non-zero for cosine
+        probe = [0.0] * 1536
+        probe[0] = 1.0
+        result = self.index.query(
+            vector=probe,
+            top_k=1,
+            filter={'source_sha': {'$eq': source_sha}, 'index_complete': {'$eq': True}},
+            include_values=False,
+            include_metadata=False
+        )
+        return bool(result.matches)
     
     def index_document(self, file_path: str, metadata: Dict):
         """
@@ -83,32 +225,26 @@ class RAGIndexer:
             for i in range(0, len(chunks), batch_size):
                 batch_chunks = chunks[i:i+batch_size]
                 
-                # Generate embeddings for batch
-                try:
-                    embeddings_response = self.client.embeddings.create(
-                        model="text-embedding-3-small",
-                        input=batch_chunks
-                    )
-                except Exception as e:
-                    logger.error(f"Error generating embeddings: {str(e)}")
-                    raise
+                # Generate embeddings for batch (cached chunks skip the API)
+                embeddings = self._embed_chunks(batch_chunks)
                 
                 # Prepare vectors for Pinecone
                 vectors = []
                 for j, chunk in enumerate(batch_chunks):
                     chunk_index = i + j
                     vector_id = f"{metadata['standard'].replace(' ', '_').replace(':', '_')}-chunk-{chunk_index}"
-                    embedding = embeddings_response.data[j].embedding
+                    embedding = embeddings[j]
                     
                     vectors.append({
                         'id': vector_id,
-                        'values': embedding,
+                        'values': embedding.tolist(),
                         'metadata': {
                             'text': chunk,
                             'standard': metadata['standard'],
                             'category': metadata.get('category', 'unknown'),
                             'chunk_index': chunk_index,
-                            'file_name': os.path.basename(file_path)
+                            'file_name': os.path.basename(file_path),
+                            'source_sha': metadata.get('source_sha', '')
                         }
                     })
                 
@@ -120,9 +256,11 @@ class RAGIndexer:
                 except Exception as e:
                     logger.error(f"Error uploading to Pinecone: {str(e)}")
                     raise
-                
-                # Small delay to avoid rate limits
-                time.sleep(0.5)
+            
+            # Mark the document complete only once every batch is in, so a run that
+            # fails partway is re-indexed next time instead of skipped
+            if total_uploaded:
+                self.index.update(id=vectors[-1]['id'], set_metadata={'index_complete': True})
             
             logger.info(f"✅ Successfully indexed {metadata['standard']} ({total_uploaded} chunks)")
             return total_uploaded
@@ -2,24 +2,65 @@
 S3 Storage Service - Store and retrieve PDFs from Amazon S3
 """
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+import functools
+import io
 import logging
-from typing import BinaryIO, Optional
-from datetime import datetime
+from typing import BinaryIO, Optional, Set
+from datetime import datetime, timezone
 import os
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Upload large inspection PDFs as parallel 8 MB parts
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+
+def _ascii_filename(filename: str) -> str:
+    """S3 metadata must be ASCII: drop non-ASCII characters from the filename"""
+    if not filename.isascii():
+        filename = filename.encode('ascii', 'ignore').decode('ascii')
+    return filename or 'report.pdf'
+
+
+@functools.lru_cache(maxsize=1)
+def _s3_client():
+    """Process-wide S3 client (boto3 clients are thread-safe)"""
+    return boto3.client(
+        's3',
+        config=Config(
+            max_pool_connections=50,
+            retries={'mode': 'adaptive'}
+        )
+    )
+
+
 class S3Storage:
     """Handle PDF storage in Amazon S3"""
     
+    # Buckets already verified/created by this process
+    _bucket_checked: Set[str] = set()
+    
     def __init__(self, bucket_name: str = "validert-reports"):
-        self.s3_client = boto3.client('s3')
+        self.s3_client = _s3_client()
         self.bucket_name = bucket_name
-        self._ensure_bucket_exists()
+        if bucket_name not in S3Storage._bucket_checked:
+            self._ensure_bucket_exists()
+            S3Storage._bucket_checked.add(bucket_name)
     
     def _ensure_bucket_exists(self):
         """Create S3 bucket if it doesn't exist"""
+        if not settings.VALIDERT_ENSURE_BUCKET:
+            return
         try:
             self.s3_client.head_bucket(Bucket=self.bucket_name)
             logger.info(f"S3 bucket '{self.bucket_name}' exists")
@@ -64,7 +105,7 @@ class S3Storage:
         """
         try:
             # Create S3 key with structure: reports/{user_id}/{report_id}/{filename}
-            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
             s3_key = f"reports/user_{user_id}/report_{report_id}/{timestamp}_{filename}"
             
             # Upload to S3
@@ -78,9 +119,10 @@ class S3Storage:
                     'Metadata': {
                         'user_id': str(user_id),
                         'report_id': str(report_id),
-                        'original_filename': filename.encode('ascii', 'ignore').decode('ascii') or 'report.pdf'
+                        'original_filename': _ascii_filename(filename)
                     }
-                }
+                },
+                Config=TRANSFER_CONFIG
             )
             
             logger.info(f"Uploaded PDF to S3: {s3_key}")
@@ -90,27 +132,47 @@ class S3Storage:
             logger.error(f"Error uploading to S3: {str(e)}")
             raise
     
-    def download_pdf(self, s3_key: str) -> bytes:
+    def stream_pdf(self, s3_key: str, sink: BinaryIO, chunk_size: int = 1 << 20) -> int:
         """
-        Download PDF from S3
+        Stream PDF from S3 into a writable file object without buffering it whole
         
         Args:
             s3_key: S3 key (path) of the file
+            sink: Binary file-like object to write into
+            chunk_size: Bytes read from S3 per write
         
         Returns:
-            PDF file content as bytes
+            Number of bytes written
         """
         try:
-            response = self.s3_client.get_object(
+            body = self.s3_client.get_object(
                 Bucket=self.bucket_name,
                 Key=s3_key
-            )
-            return response['Body'].read()
+            )['Body']
+            written = 0
+            for chunk in iter(lambda: body.read(chunk_size), b''):
+                sink.write(chunk)
+                written += len(chunk)
+            return written
             
         except Exception as e:
             logger.error(f"Error downloading from S3: {str(e)}")
             raise
     
+    def download_pdf(self, s3_key: str) -> bytes:
+        """
+        Download PDF from S3
+        
+        Args:
+            s3_key: S3 key (path) of the file
+        
+        Returns:
+            PDF file content as bytes
+        """
+        buffer = io.BytesIO()
+        self.stream_pdf(s3_key, buffer)
+        return buffer.getvalue()
+    
     def get_presigned_url(self, s3_key: str, expiration: int = 3600) -> str:
         """
         Generate presigned URL for PDF download
@@ -2,18 +2,63 @@
 SQS Processor - Send PDF processing jobs to SQS queue
 """
 import boto3
+import functools
 import json
 import logging
-from typing import Optional
+import time
+from typing import Dict, List, Optional
+from botocore.config import Config
 from app.config import settings
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+QUEUE_NAME = 'validert-pdf-processing-queue'
+
+# SQS accepts at most 10 entries per SendMessageBatch call
+SQS_BATCH_SIZE = 10
+
+
+def _dumps(payload: dict) -> str:
+    """Compact JSON for SQS message bodies"""
+    if orjson is not None:
+        return orjson.dumps(payload).decode('utf-8')
+    return json.dumps(payload, separators=(',', ':'))
+
+
+def _message_attributes(report_id: int, user_id: int) -> dict:
+    """SQS MessageAttributes carrying the report and user IDs"""
+    return {
+        'ReportId': {'StringValue': str(report_id), 'DataType': 'Number'},
+        'UserId': {'StringValue': str(user_id), 'DataType': 'Number'}
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _sqs_client():
+    """Process-wide SQS client (boto3 clients are thread-safe)"""
+    return boto3.client(
+        'sqs',
+        region_name='eu-north-1',
+        config=Config(max_pool_connections=50)
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _queue_url(queue_name: str) -> str:
+    """Resolve a queue URL once per process (failures are not cached)"""
+    return _sqs_client().get_queue_url(QueueName=queue_name)['QueueUrl']
+
+
 class SQSProcessor:
     """Send PDF processing jobs to SQS for async processing"""
     
     def __init__(self):
-        self.sqs = boto3.client('sqs', region_name='eu-north-1')
+        self.sqs = _sqs_client()
         self.queue_url = None
         self._get_or_create_queue()
     
@@ -21,8 +66,7 @@ class SQSProcessor:
         """Get the SQS queue URL (queue should already exist)"""
         try:
             # Try to get queue URL (queue should already exist)
-            response = self.sqs.get_queue_url(QueueName='validert-pdf-processing-queue')
-            self.queue_url = response['QueueUrl']
+            self.queue_url = _queue_url(QUEUE_NAME)
             logger.info(f"Using SQS queue: {self.queue_url}")
         except Exception as e:
             # If queue doesn't exist or we don't have permission, log and set to None
@@ -68,17 +112,8 @@ class SQSProcessor:
             
             response = self.sqs.send_message(
                 QueueUrl=self.queue_url,
-                MessageBody=json.dumps(message_body),
-                MessageAttributes={
-                    'ReportId': {
-                        'StringValue': str(report_id),
-                        'DataType': 'Number'
-                    },
-                    'UserId': {
-                        'StringValue': str(user_id),
-                        'DataType': 'Number'
-                    }
-                }
+                MessageBody=_dumps(message_body),
+                MessageAttributes=_message_attributes(report_id, user_id)
             )
             
             message_id = response['MessageId']
@@ -89,6 +124,70 @@ class SQSProcessor:
             logger.error(f"Error sending to SQS: {str(e)}")
             raise
     
+    def send_pdf_processing_jobs(self, jobs: List[Dict], max_retries: int = 3) -> List[str]:
+        """
+        Send several PDF processing jobs using SendMessageBatch (10 per call)
+        
+        Args:
+            jobs: Dicts with the keyword arguments of send_pdf_processing_job
+                (s3_key, report_id, user_id, filename and optional
+                report_system / building_year)
+            max_retries: Attempts for entries SQS reports as failed
+        
+        Returns:
+            SQS message IDs, in the same order as jobs
+        """
+        if not self.queue_url:
+            raise Exception("SQS queue URL not available. Queue may need to be created or permissions configured.")
+        
+        message_ids: List[Optional[str]] = [None] * len(jobs)
+        try:
+            for start in range(0, len(jobs), SQS_BATCH_SIZE):
+                pending = {
+                    str(i): {
+                        'Id': str(i),
+                        'MessageBody': _dumps({
+                            's3_key': job['s3_key'],
+                            's3_bucket': settings.S3_BUCKET_NAME,
+                            'report_id': job['report_id'],
+                            'user_id': job['user_id'],
+                            'filename': job['filename'],
+                            'report_system': job.get('report_system'),
+                            'building_year': job.get('building_year')
+                        }),
+                        'MessageAttributes': _message_attributes(job['report_id'], job['user_id'])
+                    }
+                    for i, job in enumerate(jobs[start:start + SQS_BATCH_SIZE], start)
+                }
+                
+                for attempt in range(max_retries):
+                    response = self.sqs.send_message_batch(
+                        QueueUrl=self.queue_url,
+                        Entries=list(pending.values())
+                    )
+                    for entry in response.get('Successful', []):
+                        message_ids[int(entry['Id'])] = entry['MessageId']
+                        pending.pop(entry['Id'], None)
+                    
+                    if not pending:
+                        break
+                    if attempt < max_retries - 1:
+                        # Exponential backoff: 1s, 2s, ...
+                        wait_time = 2 ** attempt
+                        logger.warning(f"{len(pending)} SQS entries failed (attempt {attempt + 1}/{max_retries}), retrying in {wait_time}s...")
+                        time.sleep(wait_time)
+                
+                if pending:
+                    failed = [f"{e['Id']}: {e.get('Message', e.get('Code'))}" for e in response.get('Failed', [])]
+                    raise Exception(f"Failed to send {len(pending)} SQS messages: {failed}")
+            
+            logger.info(f"Sent {len(jobs)} PDF processing jobs to SQS")
+            return message_ids
+            
+        except Exception as e:
+            logger.error(f"Error sending batch to SQS: {str(e)}")
+            raise
+    
     def get_queue_stats(self):
         """Get queue statistics"""
         try:
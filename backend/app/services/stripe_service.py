@@ -2,30 +2,68 @@
 Stripe payment service for credit purchases
 """
 import stripe
+import functools
+import hashlib
+import hmac
 import logging
+import time
 from typing import Optional, Dict, Any
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Initialize Stripe
-if settings.STRIPE_SECRET_KEY:
+# Stripe settings are fixed for the lifetime of the process
+_STRIPE_ENABLED = bool(settings.STRIPE_SECRET_KEY)
+_CURRENCY = settings.STRIPE_CURRENCY
+_WEBHOOK_SECRET = settings.STRIPE_WEBHOOK_SECRET
+
+# Shared, read-only request fragments; per-call dicts only add the varying keys
+_AUTO_PM = {"enabled": True}
+_INTENT_TEMPLATE = {
+    "currency": _CURRENCY,
+    "automatic_payment_methods": _AUTO_PM,
+}
+_PRODUCT_DATA = {"name": "Verifisert Credits"}
+_SESSION_TEMPLATE = {
+    "payment_method_types": ["card"],
+    "mode": "payment",
+}
+
+# Reject webhook signatures older than this (same default as the Stripe SDK)
+WEBHOOK_TOLERANCE_SECONDS = 300
+
+# Initialize Stripe: one client (and HTTP connection pool) shared by the process
+_STRIPE: Optional[stripe.StripeClient] = None
+if _STRIPE_ENABLED:
     stripe.api_key = settings.STRIPE_SECRET_KEY
+    _STRIPE = stripe.StripeClient(
+        api_key=settings.STRIPE_SECRET_KEY,
+        http_client=stripe.RequestsClient(timeout=30)
+    )
 else:
     logger.warning("Stripe secret key not configured. Payment features will be disabled.")
 
+
+def require_stripe(fn):
+    """Raise ValueError when Stripe is not configured instead of calling fn"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _STRIPE_ENABLED:
+            raise ValueError("Stripe is not configured")
+        return fn(*args, **kwargs)
+    return wrapper
+
+
 class StripeService:
     """Service for handling Stripe payment operations"""
     
     @staticmethod
+    @require_stripe
     def create_customer(email: str, name: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a Stripe customer
         Returns: Stripe customer object
         """
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("Stripe is not configured")
-        
         customer_data = {
             "email": email,
         }
@@ -33,13 +71,14 @@ class StripeService:
             customer_data["name"] = name
         
         try:
-            customer = stripe.Customer.create(**customer_data)
+            customer = _STRIPE.customers.create(params=customer_data)
             return customer
         except stripe.error.StripeError as e:
             logger.error(f"Error creating Stripe customer: {str(e)}")
             raise
     
     @staticmethod
+    @require_stripe
     def create_payment_intent(
         amount_nok: int,
         customer_id: Optional[str] = None,
@@ -50,16 +89,8 @@ class StripeService:
         amount_nok: Amount in øre (e.g., 165000 for 1650 NOK)
         Returns: PaymentIntent object with client_secret
         """
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("Stripe is not configured")
-        
-        intent_data = {
-            "amount": amount_nok,
-            "currency": settings.STRIPE_CURRENCY,
-            "automatic_payment_methods": {
-                "enabled": True,
-            },
-        }
+        intent_data = _INTENT_TEMPLATE.copy()
+        intent_data["amount"] = amount_nok
         
         if customer_id:
             intent_data["customer"] = customer_id
@@ -68,26 +99,25 @@ class StripeService:
             intent_data["metadata"] = metadata
         
         try:
-            intent = stripe.PaymentIntent.create(**intent_data)
+            intent = _STRIPE.payment_intents.create(params=intent_data)
             return intent
         except stripe.error.StripeError as e:
             logger.error(f"Error creating payment intent: {str(e)}")
             raise
     
     @staticmethod
+    @require_stripe
     def retrieve_payment_intent(payment_intent_id: str) -> Dict[str, Any]:
         """Retrieve a PaymentIntent by ID"""
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("Stripe is not configured")
-        
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            intent = _STRIPE.payment_intents.retrieve(payment_intent_id)
             return intent
         except stripe.error.StripeError as e:
             logger.error(f"Error retrieving payment intent: {str(e)}")
             raise
     
     @staticmethod
+    @require_stripe
     def create_checkout_session(
         amount_nok: int,
         success_url: str,
@@ -99,25 +129,17 @@ class StripeService:
         Create a Stripe Checkout Session
         Returns: Checkout session with URL
         """
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("Stripe is not configured")
-        
-        session_data = {
-            "payment_method_types": ["card"],
-            "line_items": [{
-                "price_data": {
-                    "currency": settings.STRIPE_CURRENCY,
-                    "product_data": {
-                        "name": "Verifisert Credits",
-                    },
-                    "unit_amount": amount_nok,
-                },
-                "quantity": 1,
-            }],
-            "mode": "payment",
-            "success_url": success_url,
-            "cancel_url": cancel_url,
-        }
+        session_data = _SESSION_TEMPLATE.copy()
+        session_data["line_items"] = [{
+            "price_data": {
+                "currency": _CURRENCY,
+                "product_data": _PRODUCT_DATA,
+                "unit_amount": amount_nok,
+            },
+            "quantity": 1,
+        }]
+        session_data["success_url"] = success_url
+        session_data["cancel_url"] = cancel_url
         
         if customer_id:
             session_data["customer"] = customer_id
@@ -126,23 +148,62 @@ class StripeService:
             session_data["metadata"] = metadata
         
         try:
-            session = stripe.checkout.Session.create(**session_data)
+            session = _STRIPE.checkout.sessions.create(params=session_data)
             return session
         except stripe.error.StripeError as e:
             logger.error(f"Error creating checkout session: {str(e)}")
             raise
     
+    @staticmethod
+    def verify_webhook(payload: bytes, sig_header: str) -> bool:
+        """
+        Verify a Stripe-Signature header against the raw webhook payload
+        
+        Parses 't=...,v1=...' once and checks one HMAC-SHA256 against every
+        v1 signature with a constant-time compare. Use construct_webhook_event
+        when the full Stripe event object is needed.
+        """
+        if not _WEBHOOK_SECRET:
+            raise ValueError("Stripe webhook secret not configured")
+        if not sig_header:
+            return False
+        
+        timestamp = None
+        signatures = []
+        for item in sig_header.split(','):
+            key, _, value = item.strip().partition('=')
+            if key == 't':
+                timestamp = value
+            elif key == 'v1':
+                signatures.append(value)
+        
+        if not timestamp or not signatures:
+            return False
+        try:
+            if abs(time.time() - int(timestamp)) > WEBHOOK_TOLERANCE_SECONDS:
+                logger.error("Webhook timestamp outside tolerance zone")
+                return False
+        except ValueError:
+            return False
+        
+        expected = hmac.new(
+            _WEBHOOK_SECRET.encode('utf-8'),
+            timestamp.encode('utf-8') + b'.' + payload,
+            hashlib.sha256
+        ).hexdigest()
+        return any(hmac.compare_digest(expected, signature) for signature in signatures)
+    
     @staticmethod
     def construct_webhook_event(payload: bytes, sig_header: str) -> Dict[str, Any]:
         """
         Verify and construct webhook event from Stripe
         """
-        if not settings.STRIPE_WEBHOOK_SECRET:
+        if not _WEBHOOK_SECRET:
             raise ValueError("Stripe webhook secret not configured")
         
         try:
             event = stripe.Webhook.construct_event(
-                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+                payload, sig_header, _WEBHOOK_SECRET
             )
             return event
         except ValueError as e:
@@ -153,30 +214,21 @@ class StripeService:
             raise
     
     @staticmethod
+    @require_stripe
     def refund_payment(payment_intent_id: str, amount: Optional[int] = None) -> Dict[str, Any]:
         """
         Refund a payment
         amount: Optional amount in øre. If None, full refund.
         """
-        if not settings.STRIPE_SECRET_KEY:
-            raise ValueError("Stripe is not configured")
-        
         try:
-            # Retrieve the payment intent to get the charge ID
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            
-            if not intent.charges.data:
-                raise ValueError("No charges found for this payment intent")
-            
-            charge_id = intent.charges.data[0].id
-            
+            # Refunds accept the PaymentIntent directly - no charge lookup needed
             refund_data = {
-                "charge": charge_id,
+                "payment_intent": payment_intent_id,
             }
             if amount:
                 refund_data["amount"] = amount
             
-            refund = stripe.Refund.create(**refund_data)
+            refund = _STRIPE.refunds.create(params=refund_data)
             return refund
         except stripe.error.StripeError as e:
             logger.error(f"Error creating refund: {str(e)}")
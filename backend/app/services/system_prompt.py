@@ -1,8 +1,43 @@
 """
 System prompt for AI analysis of Norwegian building condition reports.
 Loaded from the current validated baseline files.
+
+SYSTEM_PROMPT (and the cacheable SYSTEM_PROMPT_BLOCK) are resolved on first
+attribute access (PEP 562) so importing this module does not read the prompt
+file from disk.
 """
 
+import functools
+from typing import Dict, List
+
 from app.services.validert_files import get_system_prompt
 
-SYSTEM_PROMPT = get_system_prompt()
+
+@functools.lru_cache(maxsize=1)
+def get_cached_system_prompt() -> str:
+    return get_system_prompt()
+
+
+@functools.lru_cache(maxsize=1)
+def get_system_prompt_block() -> List[Dict]:
+    """
+    System prompt as an Anthropic content block marked for prompt caching.
+
+    Keep report-specific data out of this block so the cached prefix stays
+    byte-identical across requests.
+    """
+    return [
+        {
+            "type": "text",
+            "text": get_cached_system_prompt(),
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+
+
+def __getattr__(name: str):
+    if name == "SYSTEM_PROMPT":
+        return get_cached_system_prompt()
+    if name == "SYSTEM_PROMPT_BLOCK":
+        return get_system_prompt_block()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
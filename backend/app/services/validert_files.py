@@ -1,8 +1,19 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Optional, Tuple
 import hashlib
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to stdlib json
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:  # schema validation is skipped without fastjsonschema
+    fastjsonschema = None
+
 FILES_DIR = Path(__file__).resolve().parents[3] / "files"
 
 SYSTEM_PROMPT_PATH = FILES_DIR / "system_prompt_validert_v1.6.txt"
@@ -15,9 +26,41 @@ OUTPUT_OVERLAY_PATH = FILES_DIR / "scoring_policy.validert_output_overlay.v1.1.j
 DETECTED_POINTS_SCHEMA_PATH = FILES_DIR / "validert_detected_points_v1.0.schema.json"
 FEEDBACK_SCHEMA_PATH = FILES_DIR / "validert_feedback_v1.1.schema.json"
 
+# Files concatenated by build_prompt_context, in prompt order
+_CONTEXT_PATHS = (
+    RAG_LEGAL_PATH,
+    RAG_RULES_PATH,
+    RAG_LANGUAGE_PATH,
+    SCORING_MODEL_PATH,
+    OUTPUT_SCHEMA_PATH,
+    OUTPUT_OVERLAY_PATH,
+    DETECTED_POINTS_SCHEMA_PATH,
+    FEEDBACK_SCHEMA_PATH,
+)
+
+# path -> (st_mtime_ns, st_size, stripped text, sha256 of text); re-read only
+# when the file changes
+_FILE_CACHE: Dict[Path, Tuple[int, int, str, str]] = {}
+
+
+def _read_entry(path: Path) -> Tuple[int, int, str, str]:
+    st = path.stat()
+    entry = _FILE_CACHE.get(path)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry
+    text = path.read_text(encoding="utf-8").strip()
+    entry = (st.st_mtime_ns, st.st_size, text, hashlib.sha256(text.encode("utf-8")).hexdigest())
+    _FILE_CACHE[path] = entry
+    return entry
+
 
 def _read_text(path: Path) -> str:
-    return path.read_text(encoding="utf-8").strip()
+    return _read_entry(path)[2]
+
+
+def _context_key() -> Tuple[Tuple[int, int], ...]:
+    """(mtime_ns, size) of every prompt-context file; changes when any file does"""
+    return tuple((st.st_mtime_ns, st.st_size) for st in (path.stat() for path in _CONTEXT_PATHS))
 
 
 def get_system_prompt() -> str:
@@ -52,21 +95,63 @@ def get_feedback_schema_text() -> str:
     return _read_text(FEEDBACK_SCHEMA_PATH)
 
 
+def _loads(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def get_scoring_model_info() -> Dict[str, str]:
-    text = get_scoring_model_text()
+    _, _, text, sha256 = _read_entry(SCORING_MODEL_PATH)
+    return dict(_scoring_model_info(sha256, text))
+
+
+@lru_cache(maxsize=1)
+def _scoring_model_info(sha256: str, text: str) -> Dict[str, str]:
+    """Parsed only when the scoring model changes; keyed on its sha256"""
     try:
-        payload = json.loads(text)
-    except json.JSONDecodeError:
+        payload = _loads(text)
+    except ValueError:  # json.JSONDecodeError and orjson.JSONDecodeError
+        payload = {}
+    if not isinstance(payload, dict):
         payload = {}
     return {
         "model_id": str(payload.get("model", "")),
         "version": str(payload.get("version", "")),
         "updated_at": str(payload.get("updated_at", "")),
-        "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "sha256": sha256,
     }
 
 
+def _compile_validator(path: Path) -> Optional[Callable]:
+    """Compile a JSON schema file into a validator function, or None without fastjsonschema"""
+    if fastjsonschema is None:
+        return None
+    # use_default=False: validation must not write schema defaults into the checked object
+    return fastjsonschema.compile(_loads(_read_text(path)), use_default=False)
+
+
+@lru_cache(maxsize=None)
+def get_output_validator() -> Optional[Callable]:
+    return _compile_validator(OUTPUT_SCHEMA_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_detected_points_validator() -> Optional[Callable]:
+    return _compile_validator(DETECTED_POINTS_SCHEMA_PATH)
+
+
+@lru_cache(maxsize=None)
+def get_feedback_validator() -> Optional[Callable]:
+    return _compile_validator(FEEDBACK_SCHEMA_PATH)
+
+
 def build_prompt_context() -> str:
+    return _build_prompt_context(_context_key())
+
+
+@lru_cache(maxsize=1)
+def _build_prompt_context(context_key: Tuple[Tuple[int, int], ...]) -> str:
     rag_sections = get_rag_sections()
     return "\n\n".join(
         [
@@ -82,6 +167,25 @@ def build_prompt_context() -> str:
     ).strip()
 
 
+def get_prompt_context_block() -> Dict[str, str]:
+    """
+    Static prompt prefix for provider prompt caching.
+
+    The context is byte-stable across requests (fixed section order, no
+    timestamps), so it must be sent before any report-specific content.
+    cache_key is the prompt-context sha256.
+    """
+    return {
+        "cached_prefix": build_prompt_context(),
+        "cache_key": get_prompt_context_sha(),
+    }
+
+
 def get_prompt_context_sha() -> str:
-    context = build_prompt_context()
+    return _prompt_context_sha(_context_key())
+
+
+@lru_cache(maxsize=1)
+def _prompt_context_sha(context_key: Tuple[Tuple[int, int], ...]) -> str:
+    context = _build_prompt_context(context_key)
     return hashlib.sha256(context.encode("utf-8")).hexdigest()
@@ -1,4 +1,5 @@
 import argparse
+import sys
 import uvicorn
 from app.config import settings
 
@@ -17,6 +18,9 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=settings.ENVIRONMENT == "development",
+        # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         limit_concurrency=1000,
         limit_max_requests=10000,
         timeout_keep_alive=5
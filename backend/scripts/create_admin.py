@@ -9,6 +9,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import update
+
 from app.database import SessionLocal
 from app.models import User
 
@@ -16,18 +18,23 @@ def create_admin(email: str):
     """Create or promote a user to admin"""
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.email == email).first()
+        # Single indexed UPDATE ... RETURNING (users.email is unique + indexed)
+        user = db.execute(
+            update(User)
+            .where(User.email == email)
+            .values(is_admin=1, status="active")
+            .returning(User.id, User.name, User.email)
+        ).first()
         
         if not user:
+            db.rollback()
             print(f"❌ User with email '{email}' not found.")
             print("\nAvailable users:")
-            users = db.query(User).all()
+            users = db.query(User.id, User.name, User.email).order_by(User.id).yield_per(100)
             for u in users:
                 print(f"  - {u.email} (ID: {u.id}, Name: {u.name})")
             return False
         
-        user.is_admin = 1
-        user.status = "active"
         db.commit()
         
         print(f"✅ User '{email}' (ID: {user.id}) is now an admin!")
@@ -4,6 +4,7 @@ Run this after setting up Pinecone API key in .env
 """
 import sys
 import os
+import hashlib
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -11,6 +12,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app.services.rag_indexer import RAGIndexer
 from app.config import settings
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +21,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Documents indexed concurrently
+MAX_WORKERS = 4
+
+# Re-index even when a file's content hash is already in Pinecone
+FORCE_REINDEX = '--force' in sys.argv[1:]
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
 def main():
     """Index all standards documents"""
     
@@ -73,29 +90,46 @@ def main():
         }
     ]
     
-    # Index each document
+    # Index documents in parallel (each one is dominated by embedding API round-trips)
     total_chunks = 0
-    for i, std in enumerate(standards, 1):
-        print(f"[{i}/{len(standards)}] Indexing {std['name']}...")
-        
-        # Check if file exists
+    pending = []
+    for std in standards:
         if not os.path.exists(std['path']):
             logger.error(f"File not found: {std['path']}")
             continue
         
+        # Skip files whose exact content is already indexed
+        std['source_sha'] = file_sha256(std['path'])
         try:
-            num_chunks = indexer.index_document(
+            if not FORCE_REINDEX and indexer.is_document_indexed(std['source_sha']):
+                print(f"⏭️  {std['name']} unchanged, skipping (use --force to re-index)")
+                continue
+        except Exception as e:
+            logger.warning(f"Could not check existing vectors for {std['name']}: {str(e)}")
+        pending.append(std)
+    
+    print(f"Indexing {len(pending)}/{len(standards)} standards ({MAX_WORKERS} in parallel)...\n")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                indexer.index_document,
                 file_path=std['path'],
                 metadata={
                     'standard': std['name'],
-                    'category': std['category']
+                    'category': std['category'],
+                    'source_sha': std['source_sha']
                 }
-            )
-            total_chunks += num_chunks
-            print(f"✅ {std['name']} indexed successfully ({num_chunks} chunks)\n")
-        except Exception as e:
-            logger.error(f"❌ Failed to index {std['name']}: {str(e)}\n")
-            continue
+            ): std
+            for std in pending
+        }
+        for future in as_completed(futures):
+            std = futures[future]
+            try:
+                num_chunks = future.result()
+                total_chunks += num_chunks
+                print(f"✅ {std['name']} indexed successfully ({num_chunks} chunks)\n")
+            except Exception as e:
+                logger.error(f"❌ Failed to index {std['name']}: {str(e)}\n")
     
     # Get final index stats
     print("\n=== Indexing Complete ===\n")
@@ -3,12 +3,14 @@ Index Norwegian standards using AWS Bedrock embeddings
 """
 import sys
 import os
+import hashlib
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.services.bedrock_rag_indexer import BedrockRAGIndexer
 from app.config import settings
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +18,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Documents indexed concurrently
+MAX_WORKERS = 4
+
+# Re-index even when a file's content hash is already in Pinecone
+FORCE_REINDEX = '--force' in sys.argv[1:]
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
 def main():
     """Index all standards documents using Bedrock"""
     
@@ -66,27 +83,46 @@ def main():
         }
     ]
     
+    # Index documents in parallel (each one is dominated by embedding API round-trips)
     total_chunks = 0
-    for i, std in enumerate(standards, 1):
-        print(f"[{i}/{len(standards)}] Indexing {std['name']} with Bedrock...")
-        
+    pending = []
+    for std in standards:
         if not os.path.exists(std['path']):
             logger.error(f"File not found: {std['path']}")
             continue
         
+        # Skip files whose exact content is already indexed
+        std['source_sha'] = file_sha256(std['path'])
         try:
-            num_chunks = indexer.index_document(
+            if not FORCE_REINDEX and indexer.is_document_indexed(std['source_sha']):
+                print(f"⏭️  {std['name']} unchanged, skipping (use --force to re-index)")
+                continue
+        except Exception as e:
+            logger.warning(f"Could not check existing vectors for {std['name']}: {str(e)}")
+        pending.append(std)
+    
+    print(f"Indexing {len(pending)}/{len(standards)} standards with Bedrock ({MAX_WORKERS} in parallel)...\n")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                indexer.index_document,
                 file_path=std['path'],
                 metadata={
                     'standard': std['name'],
-                    'category': std['category']
+                    'category': std['category'],
+                    'source_sha': std['source_sha']
                 }
-            )
-            total_chunks += num_chunks
-            print(f"✅ {std['name']} indexed ({num_chunks} chunks)\n")
-        except Exception as e:
-            logger.error(f"❌ Failed to index {std['name']}: {str(e)}\n")
-            continue
+            ): std
+            for std in pending
+        }
+        for future in as_completed(futures):
+            std = futures[future]
+            try:
+                num_chunks = future.result()
+                total_chunks += num_chunks
+                print(f"✅ {std['name']} indexed ({num_chunks} chunks)\n")
+            except Exception as e:
+                logger.error(f"❌ Failed to index {std['name']}: {str(e)}\n")
     
     print(f"\n✅ Indexed {total_chunks} chunks with Bedrock embeddings")
     print("Using index: validert-standards-bedrock (1024 dimensions)")
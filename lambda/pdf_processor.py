@@ -4,32 +4,116 @@ Lambda function to process PDF analysis jobs from SQS
 import json
 import os
 import boto3
-import logging
 import io
-import requests
+import logging
+import tempfile
+import threading
+import urllib3
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, Callable, List, BinaryIO, Iterable, Optional, Tuple
+from datetime import datetime, timezone
 import re
 import hashlib
+import functools
+import time
 import uuid
+import zlib
+from bisect import bisect_right
+from itertools import accumulate
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to stdlib json
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # evidence dedupe keys fall back to sha256
+    xxhash = None
+
+try:
+    import ahocorasick
+except ImportError:  # evidence search falls back to per-term str.find
+    ahocorasick = None
 
 # Configure logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-# Initialize AWS clients
-s3_client = boto3.client('s3')
-bedrock_runtime = boto3.client('bedrock-runtime', region_name='eu-north-1')
+# An unknown LOG_LEVEL falls back to INFO instead of failing INIT
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+logger.setLevel(LOG_LEVEL if isinstance(logging.getLevelName(LOG_LEVEL), int) else logging.INFO)
+
+# Initialize AWS clients; the pool covers concurrent records plus ranged S3
+# parts, and keepalive lets warm containers reuse their connections
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True,
+)
+s3_client = boto3.client('s3', config=AWS_CLIENT_CONFIG)
+bedrock_runtime = boto3.client('bedrock-runtime', region_name='eu-north-1', config=AWS_CLIENT_CONFIG)
 
 # Environment variables
 S3_BUCKET = os.environ.get('S3_BUCKET_NAME', 'validert-tilstandsrapporter')
 API_ENDPOINT = os.environ.get('API_ENDPOINT', 'https://www.verifisert.no/api')
 PIPELINE_GIT_SHA = os.environ.get('PIPELINE_GIT_SHA', '')
+BEDROCK_MODEL_ID = 'eu.anthropic.claude-sonnet-4-20250514-v1:0'
+# DynamoDB table for cached Bedrock analyses (partition key 'cache_key', TTL
+# attribute 'expires_at'); caching is disabled when unset
+ANALYSIS_CACHE_TABLE = os.environ.get('ANALYSIS_CACHE_TABLE', '')
+# PDFs larger than this are spooled to /tmp instead of held in memory
+PDF_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+PDF_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+MAX_CONCURRENT_RECORDS = int(os.environ.get('MAX_CONCURRENT_RECORDS', '10'))
+# Send all of a batch's results in one POST to /v1/reports/bulk-update-analysis
+# (the API must have that endpoint) instead of one callback per record
+BULK_API_CALLBACK = os.environ.get('BULK_API_CALLBACK', '').lower() in ('1', 'true', 'yes')
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+# Sent as X-Callback-Secret; must match the API's LAMBDA_CALLBACK_SECRET (the
+# bulk endpoint refuses callbacks without it)
+API_CALLBACK_SECRET = os.environ.get('API_CALLBACK_SECRET', '')
+
+# Keep-alive pool for API callbacks so warm containers reuse the TLS connection
+_HTTP_POOL = urllib3.PoolManager(
+    num_pools=1,
+    maxsize=MAX_CONCURRENT_RECORDS,
+    # POST is retried only when it never reached the API (connect errors) or a
+    # gateway answered 502/503/504; a read timeout may follow a commit, so read=0
+    retries=Retry(total=2, read=0, other=0, backoff_factor=0.2,
+                  status_forcelist=[502, 503, 504], allowed_methods=None),
+)
+_CALLBACK_HEADERS = {"Content-Type": "application/json"}
+if API_CALLBACK_SECRET:
+    _CALLBACK_HEADERS["X-Callback-Secret"] = API_CALLBACK_SECRET
+
+# Created at import: boto3 client construction is not thread-safe, and records
+# are processed on a thread pool
+dynamodb_client = boto3.client('dynamodb', region_name='eu-north-1', config=AWS_CLIENT_CONFIG) if ANALYSIS_CACHE_TABLE else None
 
 FILES_DIR = Path(__file__).resolve().parents[1] / "files"
 
 
+def _dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _read_file(filename: str) -> str:
     return (FILES_DIR / filename).read_text(encoding="utf-8").strip()
 
@@ -55,15 +139,17 @@ PROMPT_CONTEXT = "\n\n".join(
 
 PAGE_MARKER_RE = re.compile(r"\[SIDE (\d+)\]\n", re.IGNORECASE)
 SUMMARY_MARKERS = ["oppsummering", "takstmannens vurdering", "summary"]
-POINT_HEADER_RE = re.compile(r"^\s*(\d+(?:\.\d+){1,4})\s+(.*\S)?$")
+# Line boundaries as str.splitlines() sees them, so matching a whole page
+# with finditer gives the same headers as matching each line on its own
+_LINE_SEPS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+POINT_HEADER_RE = re.compile(
+    rf"(?:\A|(?<=[{_LINE_SEPS}]))[^\S{_LINE_SEPS}]*(\d+(?:\.\d+){{1,4}})"
+    rf"[^\S{_LINE_SEPS}]+([^{_LINE_SEPS}]*\S)?(?=[{_LINE_SEPS}]|\Z)"
+)
 TG_RE = re.compile(r"\bTG(?:0|1|2|3|IU)\b")
 
 
-def _load_scoring_model() -> Dict[str, object]:
-    try:
-        payload = json.loads(SCORING_MODEL)
-    except json.JSONDecodeError:
-        payload = {}
+def _build_scoring_model(payload: Dict[str, object]) -> Dict[str, object]:
     categories = payload.get("categories", [])
     category_order = [c.get("id") for c in categories if c.get("id")]
     if not category_order:
@@ -88,11 +174,46 @@ def _load_scoring_model() -> Dict[str, object]:
     }
 
 
+# The scoring model is bundled with the function, so parse it once per cold start
+try:
+    _SCORING_MODEL_PAYLOAD = json.loads(SCORING_MODEL) if SCORING_MODEL else {}
+except json.JSONDecodeError:
+    _SCORING_MODEL_PAYLOAD = {}
+_SCORING_MODEL_CACHED = _build_scoring_model(_SCORING_MODEL_PAYLOAD)
+_SCORING_MODEL_INFO = {
+    "model_id": str(_SCORING_MODEL_PAYLOAD.get("model", "")),
+    "version": str(_SCORING_MODEL_PAYLOAD.get("version", "")),
+    "updated_at": str(_SCORING_MODEL_PAYLOAD.get("updated_at", "")),
+    "sha256": hashlib.sha256(SCORING_MODEL.encode("utf-8")).hexdigest(),
+}
+
+
+def _load_scoring_model() -> Dict[str, object]:
+    """Parsed scoring model (shared, read-only)"""
+    return _SCORING_MODEL_CACHED
+
+
+_CATEGORY_IDS = frozenset("ABCDE")
+
+
 def _infer_category_from_rule_id(rule_id: str) -> str:
-    if not rule_id or "_" not in rule_id:
+    # Categories are single letters, so only "X_..." rule ids can match
+    if not rule_id or len(rule_id) < 2 or rule_id[1] != "_":
         return ""
-    prefix = rule_id.split("_", 1)[0].upper()
-    return prefix if prefix in {"A", "B", "C", "D", "E"} else ""
+    prefix = rule_id[0].upper()
+    return prefix if prefix in _CATEGORY_IDS else ""
+
+
+@functools.lru_cache(maxsize=1024)
+def _span_digest(value: str) -> str:
+    """
+    In-process dedupe key for an evidence snippet (never persisted)
+    
+    Snippets repeat across issues and deductions, hence the cache.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(value.encode("utf-8"))
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
 def _hash_evidence_span(evidence: object) -> str:
@@ -108,7 +229,7 @@ def _hash_evidence_span(evidence: object) -> str:
     for key in ("snippet", "text", "span_excerpt"):
         value = candidate.get(key)
         if value:
-            return hashlib.sha256(value.encode("utf-8")).hexdigest()
+            return _span_digest(value)
     return ""
 
 
@@ -120,6 +241,17 @@ def _normalize_scoring_output(analysis_output: Dict[str, object]) -> Dict[str, o
     deduct_per_occurrence = scoring_model["deduct_per_occurrence"]
     aggregate_level = str(scoring_model.get("aggregate_level", "bygningsdel")).lower()
 
+    # Pick the dedupe key once instead of re-checking the aggregate level per deduction
+    if not deduct_per_occurrence or aggregate_level in {"report", "global", "document", "rule"}:
+        def dedupe_key(component_id, rule_id, deduction):
+            return ("report", rule_id)
+    elif aggregate_level in {"issue", "evidence"}:
+        def dedupe_key(component_id, rule_id, deduction):
+            return ("issue", rule_id, _hash_evidence_span(deduction.get("evidence")) or component_id)
+    else:
+        def dedupe_key(component_id, rule_id, deduction):
+            return ("component", component_id or "unknown", rule_id)
+
     seen_keys = set()
     category_totals: Dict[str, int] = {cat: 0 for cat in category_order}
     has_deductions = False
@@ -135,27 +267,15 @@ def _normalize_scoring_output(analysis_output: Dict[str, object]) -> Dict[str, o
                 continue
             rule_id = deduction.get("rule_id", "")
             if rule_id:
-                if not deduct_per_occurrence:
-                    unique_key = f"report::{rule_id}"
-                elif aggregate_level in {"report", "global", "document", "rule"}:
-                    unique_key = f"report::{rule_id}"
-                elif aggregate_level in {"issue", "evidence"}:
-                    evidence_hash = _hash_evidence_span(deduction.get("evidence"))
-                    unique_key = f"issue::{rule_id}::{evidence_hash or component_id}"
-                else:
-                    unique_key = f"component::{component_id or 'unknown'}::{rule_id}"
+                unique_key = dedupe_key(component_id, rule_id, deduction)
                 if unique_key in seen_keys:
                     continue
                 seen_keys.add(unique_key)
             category_id = deduction.get("category_id") or _infer_category_from_rule_id(rule_id)
-            if category_id:
-                deduction["category_id"] = category_id
             deduped.append(deduction)
-        component["deductions"] = deduped
-        for deduction in deduped:
-            category_id = deduction.get("category_id") or _infer_category_from_rule_id(deduction.get("rule_id", ""))
             if not category_id:
                 continue
+            deduction["category_id"] = category_id
             has_deductions = True
             points = deduction.get("points", 0)
             try:
@@ -163,6 +283,7 @@ def _normalize_scoring_output(analysis_output: Dict[str, object]) -> Dict[str, o
             except (TypeError, ValueError):
                 points_value = 0
             category_totals[category_id] = category_totals.get(category_id, 0) + points_value
+        component["deductions"] = deduped
 
     if not has_deductions:
         return analysis_output
@@ -217,45 +338,40 @@ def _extract_snippet(text: str, index: int, window: int = 220) -> str:
 
 
 def _get_scoring_model_info() -> Dict[str, str]:
-    try:
-        payload = json.loads(SCORING_MODEL)
-    except json.JSONDecodeError:
-        payload = {}
-    return {
-        "model_id": str(payload.get("model", "")),
-        "version": str(payload.get("version", "")),
-        "updated_at": str(payload.get("updated_at", "")),
-        "sha256": hashlib.sha256(SCORING_MODEL.encode("utf-8")).hexdigest(),
-    }
+    return dict(_SCORING_MODEL_INFO)
 
 
-def _extract_detected_points(report_text: str) -> List[Dict[str, Any]]:
-    pages = _split_pages(report_text)
-    line_index: List[Dict[str, Any]] = []
-    for page in pages:
-        for line in page["text"].splitlines():
-            line_index.append({"page": page["page"], "text": line})
-
+def _extract_detected_points(report_text: str, pages: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    if pages is None:
+        pages = _split_pages(report_text)
+    # Parallel lists (page number / line text) instead of a dict per line
+    line_pages: List[int] = []
+    line_texts: List[str] = []
     headings: List[Dict[str, Any]] = []
-    for idx, line in enumerate(line_index):
-        match = POINT_HEADER_RE.match(line["text"])
-        if match:
+    for page in pages:
+        page_text = page["text"]
+        page_lines = page_text.splitlines(keepends=True)
+        # One finditer per page; headers map back to their line by offset
+        line_ends = list(accumulate(map(len, page_lines)))
+        first_idx = len(line_texts)
+        for match in POINT_HEADER_RE.finditer(page_text):
             headings.append(
                 {
-                    "idx": idx,
+                    "idx": first_idx + bisect_right(line_ends, match.start()),
                     "point_id": match.group(1),
                     "section_title": (match.group(2) or "").strip(),
                 }
             )
+        line_pages.extend([page["page"]] * len(page_lines))
+        line_texts.extend(page_text.splitlines())
 
     detected: List[Dict[str, Any]] = []
     for i, heading in enumerate(headings):
         start_idx = heading["idx"]
-        end_idx = headings[i + 1]["idx"] if i + 1 < len(headings) else len(line_index)
-        span_lines = line_index[start_idx:end_idx]
-        span_text = "\n".join(item["text"] for item in span_lines).strip()
-        page_start = span_lines[0]["page"] if span_lines else line_index[start_idx]["page"]
-        page_end = span_lines[-1]["page"] if span_lines else page_start
+        end_idx = headings[i + 1]["idx"] if i + 1 < len(headings) else len(line_texts)
+        span_text = "\n".join(line_texts[start_idx:end_idx]).strip()
+        page_start = line_pages[start_idx]
+        page_end = line_pages[end_idx - 1]
         tg_match = TG_RE.search(span_text)
         section_title = heading["section_title"] or ""
         excerpt = section_title or (span_text[:200].strip() if span_text else "")
@@ -275,28 +391,66 @@ def _extract_detected_points(report_text: str) -> List[Dict[str, Any]]:
     return detected
 
 
-def _build_evidence_for_component(component_id: str, component_title: str, tg: str, pages: List[Dict[str, str]]) -> Dict[str, Any]:
-    search_terms = [term for term in [component_id, component_title] if term]
+def _prepare_evidence_pages(pages: List[Dict[str, Any]]) -> List[Tuple[int, str, str, bool]]:
+    """(page, text, lowered text, is summary page) per page, lowered once per report"""
+    evidence_pages = []
     for page in pages:
-        page_text = page["text"]
-        lower_text = page_text.lower()
-        for term in search_terms:
-            idx = lower_text.find(term.lower())
+        lower_text = page["text"].lower()
+        is_summary = any(marker in lower_text for marker in SUMMARY_MARKERS)
+        evidence_pages.append((page["page"], page["text"], lower_text, is_summary))
+    return evidence_pages
+
+
+def _find_first_hits(terms: Iterable[str], evidence_pages: List[Tuple[int, str, str, bool]]) -> Optional[Dict[str, List[int]]]:
+    """
+    First offset of each lowered term on each page (-1 when absent)
+    
+    Scans every page once with an Aho-Corasick automaton over all terms.
+    Returns None when pyahocorasick is not installed.
+    """
+    terms = set(terms)
+    if ahocorasick is None or not terms:
+        return None
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    
+    hits = {term: [-1] * len(evidence_pages) for term in terms}
+    for pos, (_, _, lower_text, _) in enumerate(evidence_pages):
+        # Matches are reported in order of end offset, so the first one per term is the earliest
+        for end_idx, term in automaton.iter(lower_text):
+            row = hits[term]
+            if row[pos] == -1:
+                row[pos] = end_idx - len(term) + 1
+    return hits
+
+
+def _build_evidence_for_component(
+    component_id: str,
+    component_title: str,
+    tg: str,
+    evidence_pages: List[Tuple[int, str, str, bool]],
+    first_hits: Optional[Dict[str, List[int]]] = None,
+) -> Dict[str, Any]:
+    search_terms = [(term, term.lower()) for term in [component_id, component_title] if term]
+    for pos, (page_num, page_text, lower_text, is_summary) in enumerate(evidence_pages):
+        for term, term_lower in search_terms:
+            idx = first_hits[term_lower][pos] if first_hits is not None else lower_text.find(term_lower)
             if idx != -1:
                 snippet = _extract_snippet(page_text, idx)
-                source = "SUMMARY" if any(marker in lower_text for marker in SUMMARY_MARKERS) else "LOCAL"
                 return {
                     "point_id": component_id or "",
                     "tg": tg or "",
-                    "page": page["page"],
+                    "page": page_num,
                     "heading": component_title or "",
-                    "source": source,
+                    "source": "SUMMARY" if is_summary else "LOCAL",
                     "snippet": snippet,
-                    "match_explain": f"Matched '{term}' on page {page['page']}.",
+                    "match_explain": f"Matched '{term}' on page {page_num}.",
                 }
 
-    fallback_page = pages[0]["page"] if pages else 1
-    fallback_text = pages[0]["text"] if pages else ""
+    fallback_page = evidence_pages[0][0] if evidence_pages else 1
+    fallback_text = evidence_pages[0][1] if evidence_pages else ""
     return {
         "point_id": component_id or "",
         "tg": tg or "",
@@ -308,33 +462,69 @@ def _build_evidence_for_component(component_id: str, component_title: str, tg: s
     }
 
 
-def _ensure_issue_evidence(analysis_output: Dict[str, Any], report_text: str) -> None:
-    pages = _split_pages(report_text)
+def _ensure_issue_evidence(
+    analysis_output: Dict[str, Any],
+    report_text: str,
+    pages: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fill in evidence for every issue, seeding from the report text when the
+    model gave none
+
+    Returns:
+        Issue evidence indexed by rule_id, for _ensure_driver_evidence
+    """
+    if pages is None:
+        pages = _split_pages(report_text)
+    evidence_pages = _prepare_evidence_pages(pages)
+    findings = [component for component in analysis_output.get("findings", []) if isinstance(component, dict)]
+    first_hits = _find_first_hits(
+        (
+            term.lower()
+            for component in findings
+            for term in (component.get("component_id", ""), component.get("component_title", ""))
+            if term
+        ),
+        evidence_pages,
+    )
     required_keys = {"point_id", "tg", "page", "heading", "source", "snippet", "match_explain"}
-    for component in analysis_output.get("findings", []):
+    issue_evidence_by_rule: Dict[str, List[Dict[str, Any]]] = {}
+    for component in findings:
         component_id = component.get("component_id", "")
         component_title = component.get("component_title", "")
         tg = component.get("tg", "")
-        evidence_seed = _build_evidence_for_component(component_id, component_title, tg, pages)
+        evidence_seed = _build_evidence_for_component(component_id, component_title, tg, evidence_pages, first_hits)
         for issue in component.get("issues", []):
             evidence = issue.get("evidence")
             if not isinstance(evidence, list) or not evidence:
                 issue["evidence"] = [evidence_seed]
-                continue
-            normalized = _normalize_evidence_items(evidence)
-            if normalized:
-                issue["evidence"] = normalized
             else:
-                issue["evidence"] = [evidence_seed]
+                normalized = _normalize_evidence_items(evidence)
+                if normalized:
+                    issue["evidence"] = normalized
+                else:
+                    issue["evidence"] = [evidence_seed]
+            # Index for the driver pass while we're already on the issue
+            for rule_id in issue.get("rule_refs", []):
+                issue_evidence_by_rule.setdefault(rule_id, []).extend(issue["evidence"])
+    return issue_evidence_by_rule
 
 
-def _ensure_driver_evidence(analysis_output: Dict[str, Any]) -> None:
+def _ensure_driver_evidence(
+    analysis_output: Dict[str, Any],
+    issue_evidence_by_rule: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+) -> None:
     required_keys = {"point_id", "tg", "page", "heading", "source", "snippet", "match_explain"}
-    issue_evidence_by_rule: Dict[str, List[Dict[str, Any]]] = {}
-    for component in analysis_output.get("findings", []):
-        for issue in component.get("issues", []):
-            for rule_id in issue.get("rule_refs", []):
-                issue_evidence_by_rule.setdefault(rule_id, []).extend(issue.get("evidence", []))
+    # An index from _ensure_issue_evidence only holds normalized items and
+    # evidence seeds, so it just needs the snippet/page filter, not a rebuild
+    normalize_candidates = _filter_normalized_evidence
+    if issue_evidence_by_rule is None:
+        normalize_candidates = _normalize_evidence_items
+        issue_evidence_by_rule = {}
+        for component in analysis_output.get("findings", []):
+            for issue in component.get("issues", []):
+                for rule_id in issue.get("rule_refs", []):
+                    issue_evidence_by_rule.setdefault(rule_id, []).extend(issue.get("evidence", []))
 
     for driver in analysis_output.get("top_score_drivers", []):
         evidence = driver.get("evidence")
@@ -346,13 +536,13 @@ def _ensure_driver_evidence(analysis_output: Dict[str, Any]) -> None:
         for rule_id in driver.get("rule_refs", []):
             candidate = issue_evidence_by_rule.get(rule_id)
             if candidate:
-                normalized = _normalize_evidence_items(candidate)
+                normalized = normalize_candidates(candidate)
                 driver["evidence"] = normalized or [candidate[0]]
                 break
         if not driver.get("evidence"):
             for candidates in issue_evidence_by_rule.values():
                 if candidates:
-                    normalized = _normalize_evidence_items(candidates)
+                    normalized = normalize_candidates(candidates)
                     driver["evidence"] = normalized or [candidates[0]]
                     break
         if not driver.get("evidence"):
@@ -389,6 +579,11 @@ def _normalize_evidence_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any
     return normalized
 
 
+def _filter_normalized_evidence(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Items of an already-normalized list that _normalize_evidence_items would keep"""
+    return [item for item in items if item.get("snippet") and item.get("page")]
+
+
 def _ensure_required_arrays(analysis_output: Dict[str, Any]) -> None:
     analysis_output.setdefault("score_total", 0)
     analysis_output.setdefault("score_band", "")
@@ -409,84 +604,271 @@ def _ensure_meta_fields(analysis_output: Dict[str, Any]) -> None:
     meta.setdefault("document_title", "")
 
 
-def extract_text_from_pdf(pdf_content: bytes) -> str:
+_pdf_lib = None
+_pdfium_lock = threading.Lock()
+
+
+def _get_pdf_lib():
+    """
+    Import the PDF library once (during INIT inside Lambda, on first use elsewhere)
+    
+    Prefers pypdfium2 (native PDFium, much faster text extraction) and falls
+    back to PyPDF2 when it is not in the layer.
+    """
+    global _pdf_lib
+    if _pdf_lib is None:
+        try:
+            import pypdfium2
+            _pdf_lib = pypdfium2
+        except ImportError:
+            import PyPDF2
+            _pdf_lib = PyPDF2
+    return _pdf_lib
+
+
+def _prewarm_connections() -> None:
+    """
+    Open the API connection during Lambda INIT, so the first record doesn't pay
+    for it; a failure only means a cold first call. The boto3 clients already
+    resolved their credentials when they were created above
+    """
+    try:
+        _HTTP_POOL.request("HEAD", API_ENDPOINT, timeout=2, retries=False)
+    except Exception as e:
+        logger.info("API pre-warm skipped: %s", e)
+
+
+# Only inside the Lambda runtime (SQS batches are never empty there), so the
+# PDF library import and first connections land in INIT; other imports stay
+# offline and lazy
+if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    _prewarm_connections()
+    _get_pdf_lib()
+
+
+def _extract_pages_pdfium(pdfium, pdf_file: BinaryIO) -> List[str]:
+    # Buffer input needs readinto (SpooledTemporaryFile only has it from Python 3.11)
+    source = pdf_file if hasattr(pdf_file, "readinto") else pdf_file.read()
+    page_texts = []
+    # PDFium is not thread-safe, even across separate documents
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                page_texts.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return page_texts
+
+
+def extract_text_from_pdf(pdf_file: BinaryIO) -> str:
     """
-    Extract text from PDF using PyPDF2
-    Note: PyPDF2 needs to be included in Lambda layer
+    Extract text from PDF with pypdfium2, or PyPDF2 as a fallback
+    Note: the PDF library needs to be included in Lambda layer
+    
+    Args:
+        pdf_file: Seekable binary file-like object positioned anywhere
     """
     try:
-        import PyPDF2
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        pdf_file.seek(0)
+        pdf_lib = _get_pdf_lib()
+        if pdf_lib.__name__ == "pypdfium2":
+            page_texts = _extract_pages_pdfium(pdf_lib, pdf_file)
+        else:
+            page_texts = [page.extract_text() or "" for page in pdf_lib.PdfReader(pdf_file).pages]
         
         text_parts = []
-        for page_num, page in enumerate(pdf_reader.pages, 1):
-            page_text = page.extract_text() or ""
+        for page_num, page_text in enumerate(page_texts, 1):
             if page_text:
                 text_parts.append(f"[SIDE {page_num}]\n{page_text}")
         text = "\n\n".join(text_parts)
         
-        logger.info(f"Extracted {len(text)} characters from PDF")
+        logger.info("Extracted %d characters from PDF", len(text))
         return text
     except Exception as e:
-        logger.error(f"PDF extraction error: {str(e)}")
+        logger.error("PDF extraction error: %s", e)
         raise
 
 
-def analyze_with_bedrock(text: str) -> Dict:
+def _cache_get(cache_key: str):
+    """Read a cached JSON value from the analysis cache table; None on miss or error"""
+    if not ANALYSIS_CACHE_TABLE:
+        return None
+    try:
+        item = dynamodb_client.get_item(
+            TableName=ANALYSIS_CACHE_TABLE,
+            Key={'cache_key': {'S': cache_key}},
+        ).get('Item')
+        # Items without analysis_z predate compression; treat them as a miss
+        if item and 'analysis_z' in item:
+            logger.info("Analysis cache hit: %.20s", cache_key)
+            return _loads(zlib.decompress(item['analysis_z']['B']))
+    except Exception as e:
+        logger.warning("Analysis cache lookup failed: %s", e)
+    return None
+
+
+def _cache_put(cache_key: str, value: Any) -> None:
     """
-    Analyze report text using Bedrock Claude
+    Write a JSON value to the analysis cache table with the configured TTL;
+    zlib-compressed so large analyses stay under the 400 KB item limit
     """
+    if not ANALYSIS_CACHE_TABLE:
+        return
     try:
-        user_message = f"""
-{PROMPT_CONTEXT}
+        dynamodb_client.put_item(
+            TableName=ANALYSIS_CACHE_TABLE,
+            Item={
+                'cache_key': {'S': cache_key},
+                'analysis_z': {'B': zlib.compress(_dumps(value))},
+                'expires_at': {'N': str(int(time.time()) + ANALYSIS_CACHE_TTL_SECONDS)},
+            },
+        )
+    except Exception as e:
+        logger.warning("Analysis cache write failed: %s", e)
 
-===== TILSTANDSRAPPORT SOM SKAL ANALYSERES =====
+
+def analysis_cache(fn):
+    """
+    Exact-match response cache around a Bedrock analysis function.
+
+    Keyed on sha256(report text) + BEDROCK_REQUEST_SHA, so identical
+    re-submissions skip Bedrock while model, inference parameter or prompt
+    changes invalidate entries.
+    Callers that already hashed the text can pass text_sha256.
+    Cache failures are logged and never fail the record.
+    """
+    @functools.wraps(fn)
+    def wrapper(text: str, text_sha256: Optional[str] = None) -> Dict:
+        if not ANALYSIS_CACHE_TABLE:
+            return fn(text)
+
+        if text_sha256 is None:
+            text_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        cache_key = f"{text_sha256}:{BEDROCK_REQUEST_SHA}"
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = fn(text)
+        _cache_put(cache_key, result)
+        return result
+    return wrapper
+
+
+# Bedrock request body with the report text cut out. The static prompt context
+# is JSON-encoded once here instead of on every analyze_with_bedrock call.
+_REPORT_TEXT_PLACEHOLDER = "\x00REPORT_TEXT\x00"
+
+
+def _build_bedrock_body_template() -> Tuple[bytes, bytes]:
+    report_prompt = f"""===== TILSTANDSRAPPORT SOM SKAL ANALYSERES =====
 
 Analyser følgende tilstandsrapport.
 VIKTIG: Du må analysere HELE dokumentet. Alle sider, vedlegg og bilder må vurderes.
 
 Rapporttekst:
-{text[:30000]}
+{_REPORT_TEXT_PLACEHOLDER}
 
 Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
 """
+    # System prompt and prompt context are byte-stable across records and marked
+    # with cache_control so Bedrock serves them from its prompt cache
+    body = _dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 4000,
+        "temperature": 0.0,
+        "top_p": 1.0,
+        "system": [
+            {
+                "type": "text",
+                "text": SYSTEM_PROMPT_V14,
+                "cache_control": {"type": "ephemeral"}
+            }
+        ],
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": PROMPT_CONTEXT,
+                        "cache_control": {"type": "ephemeral"}
+                    },
+                    {"type": "text", "text": report_prompt}
+                ]
+            }
+        ]
+    })
+    prefix, suffix = body.split(_dumps(_REPORT_TEXT_PLACEHOLDER)[1:-1])
+    return prefix, suffix
+
+
+_BEDROCK_BODY_PREFIX, _BEDROCK_BODY_SUFFIX = _build_bedrock_body_template()
+# Everything besides the report text that determines the Bedrock answer: model id,
+# inference params, system prompt and prompt context
+BEDROCK_REQUEST_SHA = hashlib.sha256(
+    BEDROCK_MODEL_ID.encode("utf-8") + b"\n" + _BEDROCK_BODY_PREFIX + _BEDROCK_BODY_SUFFIX
+).hexdigest()
+# Version of the post-processing for the PDF-level result cache: the deployed git
+# sha plus this module's source and the scoring model, so code changes invalidate
+# cached results even when PIPELINE_GIT_SHA is not set
+PIPELINE_CACHE_SHA = hashlib.sha256(
+    "\n".join((PIPELINE_GIT_SHA, Path(__file__).read_text(encoding="utf-8"), SCORING_MODEL)).encode("utf-8")
+).hexdigest()
+
+
+def _read_streamed_text(event_stream) -> str:
+    """
+    Collect the first text content block from a Bedrock Claude response stream
+    
+    Stream errors (throttling, model errors) are raised by botocore while iterating.
+    """
+    text_parts = []
+    for event in event_stream:
+        chunk = event.get('chunk')
+        if not chunk:
+            continue
+        payload = _loads(chunk['bytes'])
+        event_type = payload.get('type')
+        if event_type == 'content_block_delta' and payload.get('index', 0) == 0:
+            delta = payload.get('delta', {})
+            if delta.get('type') == 'text_delta':
+                text_parts.append(delta.get('text', ''))
+        elif event_type == 'message_delta':
+            if payload.get('delta', {}).get('stop_reason') == 'max_tokens':
+                logger.warning("Bedrock response hit max_tokens; JSON may be truncated")
+    return "".join(text_parts)
+
+
+@analysis_cache
+def analyze_with_bedrock(text: str) -> Dict:
+    """
+    Analyze report text using Bedrock Claude
+    """
+    try:
+        # Only the report text is JSON-encoded per call; the static prompt is pre-encoded
+        body = _BEDROCK_BODY_PREFIX + _dumps(text[:30000])[1:-1] + _BEDROCK_BODY_SUFFIX
         
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4000,
-            "temperature": 0.0,
-            "top_p": 1.0,
-            "system": SYSTEM_PROMPT_V14,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": user_message
-                }
-            ]
-        })
-        
-        logger.info("Invoking Bedrock Claude...")
-        response = bedrock_runtime.invoke_model(
-            modelId='eu.anthropic.claude-sonnet-4-20250514-v1:0',
+        response = bedrock_runtime.invoke_model_with_response_stream(
+            modelId=BEDROCK_MODEL_ID,
             body=body,
             contentType='application/json',
             accept='application/json'
         )
         
-        response_body = json.loads(response['body'].read())
-        content = response_body.get('content', [])
-        
-        if content and len(content) > 0:
-            response_text = content[0].get('text', '')
-            
+        response_text = _read_streamed_text(response['body'])
+        if response_text:
             # Extract JSON
             json_start = response_text.find("{")
             json_end = response_text.rfind("}") + 1
             
             if json_start != -1 and json_end > json_start:
                 json_text = response_text[json_start:json_end]
-                analysis_data = json.loads(json_text)
+                analysis_data = _loads(json_text)
                 logger.info("Successfully analyzed report with Bedrock")
                 return analysis_data
             else:
@@ -495,7 +877,7 @@ Produser KUN gyldig JSON i henhold til OUTPUT SCHEMA. Ingen tekst utenfor JSON.
             raise ValueError("No content in Bedrock response")
             
     except Exception as e:
-        logger.error(f"Bedrock analysis error: {str(e)}")
+        logger.error("Bedrock analysis error: %s", e)
         raise
 
 
@@ -527,6 +909,26 @@ def _build_findings_from_v14(findings: List[Dict[str, Any]]) -> List[Dict[str, A
     return flattened
 
 
+def _build_update_payload(
+    analysis_data: Dict,
+    detected_points_payload: Dict,
+    scoring_result_payload: Dict,
+) -> Dict[str, Any]:
+    score_total = analysis_data.get("score_total", 0.0)
+    findings_v14 = analysis_data.get("findings", [])
+    return {
+        "overall_score": score_total,
+        "quality_score": 0.0,
+        "completeness_score": 0.0,
+        "compliance_score": 0.0,
+        "components": _build_components_from_v14(findings_v14),
+        "findings": _build_findings_from_v14(findings_v14),
+        "ai_analysis": analysis_data,
+        "detected_points": detected_points_payload,
+        "scoring_result": scoring_result_payload,
+    }
+
+
 def update_report_via_api(
     report_id: int,
     analysis_data: Dict,
@@ -538,39 +940,216 @@ def update_report_via_api(
     """
     try:
         url = f"{API_ENDPOINT}/v1/reports/{report_id}/update-analysis"
+        payload = _build_update_payload(analysis_data, detected_points_payload, scoring_result_payload)
         
-        score_total = analysis_data.get("score_total", 0.0)
-        findings_v14 = analysis_data.get("findings", [])
-        payload = {
-            "overall_score": score_total,
-            "quality_score": 0.0,
-            "completeness_score": 0.0,
-            "compliance_score": 0.0,
-            "components": _build_components_from_v14(findings_v14),
-            "findings": _build_findings_from_v14(findings_v14),
-            "ai_analysis": analysis_data,
-            "detected_points": detected_points_payload,
-            "scoring_result": scoring_result_payload,
-        }
-        
-        response = requests.post(url, json=payload, timeout=30)
+        response = _HTTP_POOL.request(
+            "POST",
+            url,
+            body=_dumps(payload),
+            headers=_CALLBACK_HEADERS,
+            timeout=30
+        )
         
-        if response.status_code == 200:
-            logger.info(f"Successfully updated report {report_id}")
+        if response.status == 200:
+            logger.info("Successfully updated report %s", report_id)
             return True
         else:
-            logger.error(f"API update failed: {response.status_code} - {response.text}")
+            logger.error("API update failed: %d - %s", response.status, response.data.decode('utf-8', 'replace'))
             return False
             
     except Exception as e:
-        logger.error(f"API callback error: {str(e)}")
+        logger.error("API callback error: %s", e)
         return False
 
 
+def update_reports_via_bulk_api(updates: List[Dict[str, Any]]) -> set:
+    """
+    Update several reports in one API callback
+    
+    Args:
+        updates: {"item_id", "report_id", "analysis"} entries; "item_id" is
+            unique within the batch and "analysis" is the payload
+            update_report_via_api would post for that report
+    
+    Returns:
+        Item IDs (as str) that were not updated
+    """
+    item_ids = {str(update["item_id"]) for update in updates}
+    try:
+        response = _HTTP_POOL.request(
+            "POST",
+            f"{API_ENDPOINT}/v1/reports/bulk-update-analysis",
+            body=_dumps({"updates": updates}),
+            headers=_CALLBACK_HEADERS,
+            timeout=60
+        )
+        
+        if response.status != 200:
+            logger.error("Bulk API update failed: %d - %s", response.status, response.data.decode('utf-8', 'replace'))
+            return item_ids
+        
+        updated = {
+            str(result.get("item_id"))
+            for result in _loads(response.data).get("results", [])
+            if result.get("status") == "success"
+        }
+        logger.info("Bulk API update: %d of %d reports updated", len(updated & item_ids), len(item_ids))
+        return item_ids - updated
+        
+    except Exception as e:
+        logger.error("Bulk API callback error: %s", e)
+        return item_ids
+
+
+def _process_record(
+    record: Dict[str, Any],
+    send_update: Callable[[Any, Dict, Dict, Dict], bool] = update_report_via_api,
+    store_result: Callable[[str, Any], None] = _cache_put,
+) -> None:
+    """
+    Process a single SQS record end to end; raises on failure
+    
+    Args:
+        record: SQS record
+        send_update: Delivers the result; same signature as update_report_via_api
+        store_result: Caches the delivered result; same signature as _cache_put
+    """
+    try:
+        # Parse SQS message
+        message_body = _loads(record['body'])
+        report_id = message_body['report_id']
+        s3_key = message_body['s3_key']
+        user_email = message_body.get('user_email', 'unknown')
+        
+        logger.info("Processing report %s for user %s", report_id, user_email)
+        
+        # Step 1: Download PDF from S3 (small PDFs stay in memory, large ones spill to /tmp)
+        logger.info("Downloading PDF from S3: %s", s3_key)
+        with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES) as pdf_file:
+            # Large PDFs are fetched as parallel ranged GETs
+            s3_client.download_fileobj(S3_BUCKET, s3_key, pdf_file, Config=PDF_TRANSFER_CONFIG)
+            pdf_size = pdf_file.seek(0, io.SEEK_END)
+            logger.info("Downloaded PDF: %d bytes", pdf_size)
+            
+            # Ranged parts can land out of order, so hash the spool after the download
+            pdf_file.seek(0)
+            pdf_digest = hashlib.sha256()
+            for block in iter(lambda: pdf_file.read(1 << 20), b''):
+                pdf_digest.update(block)
+            
+            # Byte-identical re-uploads reuse the full cached result (no extraction, no Bedrock)
+            pdf_cache_key = f"pdf:{pdf_digest.hexdigest()}:{BEDROCK_REQUEST_SHA}:{PIPELINE_CACHE_SHA}"
+            cached_result = _cache_get(pdf_cache_key)
+            if cached_result is None:
+                # Step 2: Extract text from PDF
+                text = extract_text_from_pdf(pdf_file)
+
+        if cached_result is not None:
+            run_meta = cached_result["run_meta"]
+            run_meta["run_id"] = str(uuid.uuid4())
+            run_meta["analysis_timestamp_utc"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            scoring_result_payload = {
+                "run_meta": run_meta,
+                "analysis_output": cached_result["analysis"],
+            }
+            logger.info("Updating report in database from cached result...")
+            if not send_update(
+                report_id,
+                cached_result["analysis"],
+                cached_result["detected_points"],
+                scoring_result_payload,
+            ):
+                raise Exception("Failed to update database")
+            logger.info("✅ Successfully processed report %s (cached)", report_id)
+            return
+
+        if len(text.strip()) < 100:
+            raise ValueError("Insufficient text extracted from PDF")
+
+        run_id = str(uuid.uuid4())
+        text_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        scoring_model_info = _get_scoring_model_info()
+
+        # Step 3: Analyze with Bedrock; point detection below runs while the call is in flight
+        logger.info("Analyzing with Bedrock Claude...")
+        bedrock_executor = ThreadPoolExecutor(max_workers=1)
+        bedrock_future = bedrock_executor.submit(analyze_with_bedrock, text, text_sha256=text_sha256)
+        bedrock_executor.shutdown(wait=False)
+
+        # Split pages once; shared by point detection and evidence building
+        pages = _split_pages(text)
+        detected_points = _extract_detected_points(text, pages)
+        run_meta = {
+            "run_id": run_id,
+            "analysis_timestamp_utc": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "model_name": BEDROCK_MODEL_ID,
+            "temperature": 0.0,
+            "top_p": 1.0,
+            "seed": None,
+            "text_sha256": text_sha256,
+            "scoring_model": scoring_model_info,
+            "pipeline_git_sha": PIPELINE_GIT_SHA,
+        }
+        detected_points_payload = {
+            "version": "v1.0",
+            "document": {
+                "document_hash": text_sha256,
+                "source_filename": f"report_{report_id}.pdf",
+                "page_count": 1,
+                "extraction": {
+                    "engine": "validert-point-detector",
+                    "engine_version": "1.0.0",
+                    "notes": "Point headers detected via regex on extracted PDF text.",
+                },
+            },
+            "points": detected_points,
+        }
+        
+        analysis_data = bedrock_future.result()
+        _ensure_meta_fields(analysis_data)
+        _ensure_required_arrays(analysis_data)
+        issue_evidence_by_rule = _ensure_issue_evidence(analysis_data, text, pages)
+        _ensure_driver_evidence(analysis_data, issue_evidence_by_rule)
+        _normalize_scoring_output(analysis_data)
+        meta = analysis_data.get("meta", {})
+        if isinstance(meta, dict):
+            meta.setdefault("scoring_model_id", scoring_model_info.get("model_id", ""))
+            meta.setdefault("scoring_model_version", scoring_model_info.get("version", ""))
+            meta.setdefault("scoring_model_updated_at", scoring_model_info.get("updated_at", ""))
+            analysis_data["meta"] = meta
+
+        scoring_result_payload = {
+            "run_meta": run_meta,
+            "analysis_output": analysis_data,
+        }
+        
+        # Step 4: Update database via API
+        logger.info("Updating report in database...")
+        success = send_update(report_id, analysis_data, detected_points_payload, scoring_result_payload)
+        
+        if not success:
+            raise Exception("Failed to update database")
+        # scoring_result only wraps run_meta and the analysis, so it is rebuilt on a hit
+        store_result(pdf_cache_key, {
+            "analysis": analysis_data,
+            "detected_points": detected_points_payload,
+            "run_meta": run_meta,
+        })
+        logger.info("✅ Successfully processed report %s", report_id)
+        
+    except Exception as e:
+        logger.error("❌ Failed to process record: %s", e)
+        raise
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Process SQS messages containing PDF analysis jobs
     
+    Records are independent and dominated by S3/Bedrock/API waits, so they
+    are processed concurrently on a small thread pool (boto3 clients are
+    thread-safe).
+    
     Expected message format:
     {
         "report_id": "uuid",
@@ -578,105 +1157,64 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         "user_email": "user@example.com"
     }
     """
-    logger.info(f"Received event with {len(event.get('Records', []))} messages")
+    records = event.get('Records', [])
+    logger.info("records=%d", len(records))
     
     processed = 0
-    failed = 0
+    failed_message_ids = []
+    # messageId -> bulk update entry / cache entry, filled by the worker threads in
+    # bulk mode; results are only cached once the bulk call has stored them
+    pending_updates: Dict[str, Dict[str, Any]] = {}
+    pending_cache: Dict[str, Tuple[str, Any]] = {}
     
-    for record in event.get('Records', []):
-        try:
-            # Parse SQS message
-            message_body = json.loads(record['body'])
-            report_id = message_body['report_id']
-            s3_key = message_body['s3_key']
-            user_email = message_body.get('user_email', 'unknown')
-            
-            logger.info(f"Processing report {report_id} for user {user_email}")
-            
-            # Step 1: Download PDF from S3
-            logger.info(f"Downloading PDF from S3: {s3_key}")
-            pdf_response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
-            pdf_content = pdf_response['Body'].read()
-            logger.info(f"Downloaded PDF: {len(pdf_content)} bytes")
-            
-            # Step 2: Extract text from PDF
-            logger.info("Extracting text from PDF...")
-            text = extract_text_from_pdf(pdf_content)
-
-            if len(text.strip()) < 100:
-                raise ValueError("Insufficient text extracted from PDF")
-
-            run_id = str(uuid.uuid4())
-            text_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
-            scoring_model_info = _get_scoring_model_info()
-            detected_points = _extract_detected_points(text)
-            run_meta = {
-                "run_id": run_id,
-                "analysis_timestamp_utc": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "model_name": "eu.anthropic.claude-sonnet-4-20250514-v1:0",
-                "temperature": 0.0,
-                "top_p": 1.0,
-                "seed": None,
-                "text_sha256": text_sha256,
-                "scoring_model": scoring_model_info,
-                "pipeline_git_sha": PIPELINE_GIT_SHA,
-            }
-            detected_points_payload = {
-                "version": "v1.0",
-                "document": {
-                    "document_hash": text_sha256,
-                    "source_filename": f"report_{report_id}.pdf",
-                    "page_count": 1,
-                    "extraction": {
-                        "engine": "validert-point-detector",
-                        "engine_version": "1.0.0",
-                        "notes": "Point headers detected via regex on extracted PDF text.",
-                    },
-                },
-                "points": detected_points,
+    def queue_update_for(record: Dict[str, Any]) -> Callable[[Any, Dict, Dict, Dict], bool]:
+        def queue_update(report_id, analysis_data, detected_points_payload, scoring_result_payload) -> bool:
+            pending_updates[record.get('messageId')] = {
+                "item_id": record.get('messageId'),
+                "report_id": report_id,
+                "analysis": _build_update_payload(analysis_data, detected_points_payload, scoring_result_payload),
             }
-            
-            # Step 3: Analyze with Bedrock
-            logger.info("Analyzing with Bedrock Claude...")
-            analysis_data = analyze_with_bedrock(text)
-            _ensure_meta_fields(analysis_data)
-            _ensure_required_arrays(analysis_data)
-            _ensure_issue_evidence(analysis_data, text)
-            _ensure_driver_evidence(analysis_data)
-            _normalize_scoring_output(analysis_data)
-            meta = analysis_data.get("meta", {})
-            if isinstance(meta, dict):
-                meta.setdefault("scoring_model_id", scoring_model_info.get("model_id", ""))
-                meta.setdefault("scoring_model_version", scoring_model_info.get("version", ""))
-                meta.setdefault("scoring_model_updated_at", scoring_model_info.get("updated_at", ""))
-                analysis_data["meta"] = meta
-
-            scoring_result_payload = {
-                "run_meta": run_meta,
-                "analysis_output": analysis_data,
-            }
-            
-            # Step 4: Update database via API
-            logger.info("Updating report in database...")
-            success = update_report_via_api(report_id, analysis_data, detected_points_payload, scoring_result_payload)
-            
-            if success:
-                logger.info(f"✅ Successfully processed report {report_id}")
-                processed += 1
-            else:
-                raise Exception("Failed to update database")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to process record: {str(e)}")
-            failed += 1
-            # Continue processing other messages
-            continue
+            return True
+        return queue_update
     
+    def queue_cache_for(record: Dict[str, Any]) -> Callable[[str, Any], None]:
+        def queue_cache(cache_key, value) -> None:
+            pending_cache[record.get('messageId')] = (cache_key, value)
+        return queue_cache
+    
+    if records:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_RECORDS, len(records))) as executor:
+            futures = [
+                executor.submit(_process_record, record, queue_update_for(record), queue_cache_for(record))
+                if BULK_API_CALLBACK
+                else executor.submit(_process_record, record)
+                for record in records
+            ]
+            for record, future in zip(records, futures):
+                # Failures are logged in _process_record; keep processing other messages
+                if future.exception() is None:
+                    processed += 1
+                else:
+                    failed_message_ids.append(record.get('messageId'))
+    
+    if pending_updates:
+        failed_item_ids = update_reports_via_bulk_api(list(pending_updates.values()))
+        for message_id in pending_updates:
+            if str(message_id) in failed_item_ids:
+                processed -= 1
+                failed_message_ids.append(message_id)
+            elif message_id in pending_cache:
+                _cache_put(*pending_cache[message_id])
+    
+    failed = len(failed_message_ids)
     return {
         'statusCode': 200 if failed == 0 else 207,
         'body': json.dumps({
             'processed': processed,
             'failed': failed,
-            'total': len(event.get('Records', []))
-        })
+            'total': len(records)
+        }),
+        # Partial batch response (event source mapping needs FunctionResponseTypes
+        # ReportBatchItemFailures): SQS only redelivers the failed messages
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_message_ids],
     }